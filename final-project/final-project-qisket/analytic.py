@@ -0,0 +1,155 @@
+import numpy as np
+from Final_Project.enumeration import marked_indices
+
+
+def grover_eigenphases(M, n):
+    """
+    Eigenphases (as fractions of a full turn) of G = D * O seen by the uniform state.
+
+    With theta = 2 * arcsin(sqrt(M/N)), the textbook operator has eigenvalues
+    e^(+-i*theta). Our diffusion is I - 2|s><s|, i.e. minus the textbook one, so
+    G picks up an extra e^(i*pi): phi = 1/2 +- theta / (2*pi). estimate_solutions
+    already folds that back (M > N/2 -> N - M).
+    """
+    N = 2 ** n
+    theta = 2 * np.arcsin(np.sqrt(M / N))
+    return (0.5 + theta / (2 * np.pi)) % 1.0, (0.5 - theta / (2 * np.pi)) % 1.0
+
+
+def qpe_distribution(phi, counting_qubits, outcomes=None):
+    """
+    Outcome distribution of t-qubit phase estimation for a single eigenphase 'phi'.
+
+    P(m) = | (1/T) * sum_k e^(2*pi*i*k*(phi - m/T)) |^2 with T = 2^t (the Fejer kernel),
+    evaluated in closed form for all m at once, or only for the integers in 'outcomes'.
+    """
+    T = 2 ** counting_qubits
+    outcomes = np.arange(T) if outcomes is None else np.asarray(outcomes)
+    delta = phi - outcomes / T
+    numerator = np.sin(np.pi * T * delta)
+    denominator = T * np.sin(np.pi * delta)
+
+    # delta integer -> the geometric sum is T, probability 1
+    exact = np.isclose(denominator, 0.0, atol=1e-12)
+    probabilities = np.where(exact, 1.0, (numerator / np.where(exact, 1.0, denominator)) ** 2)
+    return probabilities
+
+
+def counting_distribution(M, n, counting_qubits):
+    """
+    Exact probability of every measured value of quantum_counting_circuit for M solutions.
+
+    The uniform state splits evenly between the two Grover eigenvectors (they
+    coincide for M = 0 and M = N), and the eigenvectors are orthogonal, so the
+    distribution is the average of the two single-phase QPE distributions.
+    No circuit is built or simulated: the cost is O(2^t).
+
+    Returns:
+        np.ndarray: Probabilities indexed by the measured integer m in 0..2^t - 1
+    """
+    phi_plus, phi_minus = grover_eigenphases(M, n)
+    probabilities = 0.5 * qpe_distribution(phi_plus, counting_qubits) \
+        + 0.5 * qpe_distribution(phi_minus, counting_qubits)
+    return probabilities / probabilities.sum()
+
+
+def counts_from_probabilities(probabilities, width, shots=1024, seed=None):
+    """
+    Draws 'shots' outcomes from a distribution over the integers 0..2^width - 1.
+
+    Returns:
+        dict: Bitstring (width bits, MSB first) -> count, the same format as Aer's get_counts()
+    """
+    samples = np.random.default_rng(seed).multinomial(shots, probabilities)
+    return {format(m, f"0{width}b"): int(c) for m, c in enumerate(samples) if c}
+
+
+# Builder of each circuit kind, for the error messages of counting_metadata
+_BUILDERS = {"quantum_counting": "quantum_counting_circuit", "grover_iteration": "grover_iteration"}
+
+
+def counting_metadata(circuit, kinds=("quantum_counting", "grover_iteration")):
+    """
+    Builder metadata of a circuit, checked for the metadata-driven engines (subspace, vector).
+
+    Raises:
+        ValueError: if the circuit was not built by a builder of 'kinds', or uses an
+            approximate inverse QFT (the engines only model the exact transform)
+    """
+    metadata = circuit.metadata or {}
+    if metadata.get("kind") not in kinds:
+        raise ValueError(f"Circuit was not built by {' or '.join(_BUILDERS[kind] for kind in kinds)}")
+    if metadata.get("approximation_degree", 0):
+        raise ValueError("Approximate inverse QFTs are not simulated; use approximation_degree=0")
+    return metadata
+
+
+def sample_counts(M, n, counting_qubits, shots=1024, seed=None):
+    """
+    Samples 'shots' outcomes from counting_distribution.
+
+    Returns:
+        dict: Bitstring (t bits, MSB first) -> count, the same format as Aer's get_counts(),
+        so the usual max(counts, key=counts.get) / estimate_solutions post-processing applies
+    """
+    return counts_from_probabilities(counting_distribution(M, n, counting_qubits), counting_qubits, shots, seed)
+
+
+def analytic_counts(weights, target, counting_qubits=4, shots=1024, seed=None):
+    """
+    Drop-in replacement for simulating quantum_counting_circuit(subset_sum_oracle(weights, target)).
+
+    M comes from the vectorized classical enumeration, then the outcomes are
+    sampled from the closed-form QPE distribution.
+    """
+    M = len(marked_indices(weights, target))
+    return sample_counts(M, len(weights), counting_qubits, shots, seed)
+
+
+def approximate_iqft_report(M, n, counting_range=range(6, 13), degrees=None):
+    """
+    Accuracy versus gate count of quantum counting with an approximate inverse QFT.
+
+    The counting register before the inverse QFT holds sum_k e^(2*pi*i*k*phi)|k> / sqrt(T)
+    for each of the two Grover eigenphases (an equal mixture), so only the t-qubit
+    inverse QFT has to be simulated, even for t=12.
+
+    Args:
+        M (int): Number of solutions
+        n (int): Number of search qubits
+        counting_range (Iterable[int]): Values of t
+        degrees (Iterable[int]): Approximation degrees, defaults to 0..t-1 for every t
+
+    Returns:
+        list[dict]: One row per (t, degree): rotations and 2-qubit gates in the inverse QFT,
+        success (probability that estimate_solutions returns M) and tv_distance to the exact QFT
+    """
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+    from Final_Project.counting import inverse_qft, estimate_solutions
+
+    rows = []
+    for t in counting_range:
+        T = 2 ** t
+        estimates = np.array([estimate_solutions(m, n, t) for m in range(T)])
+        exact = counting_distribution(M, n, t)
+
+        for degree in (range(t) if degrees is None else degrees):
+            qc = QuantumCircuit(t)
+            inverse_qft(qc, list(range(t)), approximation_degree=degree)
+
+            probabilities = np.zeros(T)
+            for phi in grover_eigenphases(M, n):
+                phase_state = np.exp(2j * np.pi * phi * np.arange(T)) / np.sqrt(T)
+                probabilities += 0.5 * Statevector(phase_state).evolve(qc).probabilities()
+
+            ops = qc.count_ops()
+            rows.append({
+                "t": t,
+                "degree": degree,
+                "rotations": ops.get("cp", 0),
+                "two_qubit_gates": sum(1 for instruction in qc.data if len(instruction.qubits) == 2),
+                "success": float(probabilities[estimates == M].sum()),
+                "tv_distance": float(0.5 * np.abs(probabilities - exact).sum()),
+            })
+    return rows
@@ -0,0 +1,336 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+from qiskit import QuantumCircuit, qpy, transpile
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from Final_Project.oracle import subset_sum_oracle, subset_sum_adder_oracle, oracle_diagonal
+from Final_Project.diffusion import diffusion_operator
+from Final_Project.grover import grover_iteration
+from Final_Project.counting import (quantum_counting_circuit, controlled_grover_base, kernel_controlled,
+                                   inverse_qft)
+
+
+class CircuitCache:
+    """
+    Two-level cache for built and transpiled circuits.
+
+    Level 1 is a bounded in-memory LRU (OrderedDict, most recent last).
+    Level 2 is an optional directory of QPY files, one per key, evicted
+    least-recently-used first once the directory exceeds 'max_disk_bytes'.
+    Keys are any hashable tuple with a stable repr, e.g. those built by instance_key.
+    """
+
+    def __init__(self, max_entries=128, directory=None, max_disk_bytes=256 * 2 ** 20):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.qpy")
+
+    def get(self, key):
+        """Returns the cached circuit for 'key' or None (memory first, then disk)."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        if self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    circuit = qpy.load(f)[0]
+                # Touch the file so disk eviction sees it as recently used
+                os.utime(path)
+                self._remember(key, circuit)
+                self.disk_hits += 1
+                return circuit
+
+        self.misses += 1
+        return None
+
+    def put(self, key, circuit):
+        """Stores 'circuit' in memory and, if a directory is configured, on disk."""
+        self._remember(key, circuit)
+        if self.directory is not None:
+            with open(self._path(key), "wb") as f:
+                qpy.dump(circuit, f)
+            self._evict_disk()
+
+    def get_or_build(self, key, build):
+        """Returns the cached circuit for 'key', calling build() and caching the result on a miss."""
+        circuit = self.get(key)
+        if circuit is None:
+            circuit = build()
+            self.put(key, circuit)
+        return circuit
+
+    def stats(self):
+        """Hit/miss counters: memory hits, disk hits and misses (builds)."""
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def clear(self):
+        """Drops the in-memory level (the disk store is kept)."""
+        self._memory.clear()
+
+    def _remember(self, key, circuit):
+        self._memory[key] = circuit
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".qpy"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        # Oldest (least recently written or read) first
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+# Shared memory-only cache used when no cache is passed explicitly
+DEFAULT_CACHE = CircuitCache()
+
+# Gates whose definition is fixed by their name and parameters
+STANDARD_GATES = set(get_standard_gate_name_mapping())
+
+
+def _operation_digest(operation, memo):
+    # Shared custom gates (the one c-G reused by every power) are hashed once.
+    # The memo keeps the operation alive so its id cannot be recycled by another object.
+    key = id(operation)
+    if key not in memo:
+        h = hashlib.sha256(f"{operation.name}|{operation.num_qubits}|{operation.params!r}".encode())
+        if operation.name not in STANDARD_GATES and getattr(operation, "definition", None) is not None:
+            h.update(_circuit_digest(operation.definition, memo).encode())
+        memo[key] = (operation, h.hexdigest())
+    return memo[key][1]
+
+
+def _circuit_digest(circuit, memo):
+    h = hashlib.sha256(f"{circuit.num_qubits}|{circuit.num_clbits}|{circuit.global_phase!r}".encode())
+    for instruction in circuit.data:
+        qubits = [circuit.find_bit(q).index for q in instruction.qubits]
+        clbits = [circuit.find_bit(c).index for c in instruction.clbits]
+        h.update(f"{_operation_digest(instruction.operation, memo)}|{qubits}|{clbits};".encode())
+    return h.hexdigest()
+
+
+def circuit_fingerprint(circuit):
+    """
+    Structural sha256 of a circuit: gate names, parameters, wiring and custom definitions.
+
+    Equal for circuits built the same way (QPY bytes are not, auto-generated gate
+    names differ), so it can key anything derived from the circuit's unitary.
+    Metadata and register names are ignored.
+    """
+    return _circuit_digest(circuit, {})
+
+
+def instance_key(kind, weights=None, target=None, variant=None, n=None, **extra):
+    """
+    Canonical cache key for a subset-sum circuit.
+
+    Weights are sorted: instances that only permute the weights share one entry,
+    and the cached circuit is relabelled to the caller's qubit order on the way out.
+    """
+    weights_key = None if weights is None else tuple(sorted(weights))
+    if n is None and weights is not None:
+        n = len(weights)
+    return (kind, weights_key, target, variant, n) + tuple(sorted(extra.items()))
+
+
+def _sorting_permutation(weights):
+    # order[k] = original position of the k-th smallest weight
+    return sorted(range(len(weights)), key=lambda i: weights[i])
+
+
+def _relabel(circuit, order, weights):
+    """
+    Maps qubit k of a circuit built for the sorted weights onto qubit order[k].
+
+    The metadata gets the caller's weight order back (top level and the nested
+    oracle entry): simulators derive the marked bitstrings from it.
+    """
+    if order == sorted(order):
+        return circuit
+    qubits = list(order) + list(range(len(order), circuit.num_qubits))
+    metadata = dict(circuit.metadata or {})
+    if "weights" in metadata:
+        metadata["weights"] = list(weights)
+    if "weights" in metadata.get("oracle", {}):
+        metadata["oracle"] = dict(metadata["oracle"], weights=list(weights))
+    relabelled = QuantumCircuit(circuit.num_qubits, circuit.num_clbits, name=circuit.name, metadata=metadata)
+    relabelled.compose(circuit, qubits=qubits, inplace=True)
+    return relabelled
+
+
+def cached_oracle(weights, target, mode="per_state", cache=None):
+    """subset_sum_oracle (or the adder oracle for mode="adder") through the cache."""
+    cache = DEFAULT_CACHE if cache is None else cache
+    sorted_weights = sorted(weights)
+
+    def build():
+        if mode == "adder":
+            return subset_sum_adder_oracle(sorted_weights, target)
+        return subset_sum_oracle(sorted_weights, target, mode=mode)
+
+    oracle = cache.get_or_build(instance_key("oracle", weights, target, mode), build)
+    return _relabel(oracle, _sorting_permutation(weights), weights)
+
+
+def cached_diffusion(n, cache=None):
+    """diffusion_operator(n) through the cache (it only depends on n)."""
+    cache = DEFAULT_CACHE if cache is None else cache
+    return cache.get_or_build(instance_key("diffusion", n=n), lambda: diffusion_operator(n))
+
+
+def cached_grover_iteration(weights, target, mode="per_state", cache=None):
+    """grover_iteration of the (cached) oracle through the cache."""
+    cache = DEFAULT_CACHE if cache is None else cache
+    sorted_weights = sorted(weights)
+
+    def build():
+        oracle = cached_oracle(sorted_weights, target, mode, cache)
+        return grover_iteration(oracle, len(weights))
+
+    grover = cache.get_or_build(instance_key("grover", weights, target, mode), build)
+    return _relabel(grover, _sorting_permutation(weights), weights)
+
+
+def cached_counting_circuit(weights, target, counting_qubits=4, mode="per_state",
+                            backend=None, optimization_level=None, cache=None, control="full", stitch=False):
+    """
+    Quantum counting circuit through the cache, transpiled for 'backend' if one is given.
+
+    Only the counting register is measured, so a permutation of the weights never
+    changes the outcome and the circuit for the sorted weights is returned as is.
+    A repeated sweep over the same instances skips both construction and transpilation.
+    stitch=True assembles the transpiled circuit from cached blocks (see stitched_counting_circuit),
+    so new instances of a known (n, t) only transpile their controlled oracle.
+    """
+    cache = DEFAULT_CACHE if cache is None else cache
+    sorted_weights = sorted(weights)
+    key = instance_key("counting", weights, target, mode, t=counting_qubits, control=control)
+
+    def build():
+        oracle = cached_oracle(sorted_weights, target, mode, cache)
+        return quantum_counting_circuit(len(weights), oracle, counting_qubits=counting_qubits,
+                                        control=control)
+
+    qc = cache.get_or_build(key, build)
+    if backend is None:
+        return qc
+
+    t_key = key + (("backend", backend.name), ("optimization_level", optimization_level), ("stitch", stitch))
+    if stitch:
+        oracle = cached_oracle(sorted_weights, target, mode, cache)
+        return cache.get_or_build(t_key, lambda: stitched_counting_circuit(
+            len(weights), oracle, backend, counting_qubits, control, optimization_level=optimization_level))
+    return cache.get_or_build(
+        t_key, lambda: transpile(qc, backend, optimization_level=optimization_level))
+
+
+# Transpiled reusable blocks (c-D, inverse QFT, c-O), shared by every stitched circuit
+TRANSPILE_CACHE = CircuitCache(max_entries=512)
+
+
+def backend_target_key(backend):
+    """What a transpiled block depends on: backend name, width and supported operations."""
+    target = backend.target
+    operations = ",".join(sorted(target.operation_names))
+    coupling = target.build_coupling_map()
+    edges = None if coupling is None else sorted(coupling.get_edges())
+    digest = hashlib.sha256(f"{operations}|{edges}".encode()).hexdigest()
+    return (backend.name, target.num_qubits, digest)
+
+
+def transpile_block(block, backend, optimization_level=None, cache=None):
+    """
+    transpile(block, backend) through the cache, keyed by
+    (circuit_fingerprint(block), backend_target_key(backend), optimization_level).
+    """
+    cache = TRANSPILE_CACHE if cache is None else cache
+    key = ("transpiled_block", circuit_fingerprint(block), backend_target_key(backend), optimization_level)
+    return cache.get_or_build(key, lambda: transpile(block, backend, optimization_level=optimization_level))
+
+
+def _controlled_block(circuit, control):
+    # Control on new qubit 0, the same two constructions as controlled_grover_base
+    if control == "kernel":
+        return kernel_controlled(circuit)
+    if control != "full":
+        raise ValueError(f"Unknown control mode: {control}")
+    qc = QuantumCircuit(circuit.num_qubits + 1)
+    qc.append(circuit.to_gate().control(1), range(circuit.num_qubits + 1))
+    return qc
+
+
+def stitched_counting_circuit(n, oracle, backend, counting_qubits=4, control="full", approximation_degree=0,
+                              optimization_level=None, cache=None):
+    """
+    quantum_counting_circuit assembled from separately transpiled blocks.
+
+    c-G = c-D . c-O, so the controlled oracle is transpiled per instance, while the
+    controlled diffusion (per n and oracle width) and the swap-free inverse QFT (per t)
+    are transpiled once and reused across instances; every 2^i repetition reuses the
+    same transpiled blocks. Only for backends without a coupling map (simulators):
+    routed devices need the whole circuit laid out at once.
+
+    Returns:
+        QuantumCircuit: Backend-ready circuit with the same measurements and metadata
+        as quantum_counting_circuit
+    """
+    if backend.target.build_coupling_map() is not None:
+        raise ValueError("Stitching transpiled blocks needs a backend without a coupling map")
+
+    width = oracle.num_qubits
+    qc = QuantumCircuit(counting_qubits + width, counting_qubits,
+                        metadata={"kind": "quantum_counting", "n": n, "counting_qubits": counting_qubits,
+                                  "approximation_degree": approximation_degree,
+                                  "oracle": dict(oracle.metadata or {})})
+    counting = list(range(counting_qubits))
+    target_qubits = list(range(counting_qubits, counting_qubits + width))
+
+    qc.h(counting)
+    qc.h(target_qubits[:n])
+
+    if oracle_diagonal(oracle) is not None:
+        # Diagonal oracles already come as one native controlled-G block
+        blocks = [QuantumCircuit(width + 1)]
+        blocks[0].append(controlled_grover_base(oracle, n), range(width + 1))
+    else:
+        diffusion = QuantumCircuit(width, name="Diffusion")
+        diffusion.compose(diffusion_operator(n), qubits=range(n), inplace=True)
+        blocks = [_controlled_block(oracle, control), _controlled_block(diffusion, control)]
+    blocks = [transpile_block(block, backend, optimization_level, cache) for block in blocks]
+
+    for i in range(counting_qubits):
+        for _ in range(2 ** i):
+            for block in blocks:
+                qc.compose(block, qubits=[counting[i]] + target_qubits, inplace=True, copy=False)
+
+    iqft = QuantumCircuit(counting_qubits)
+    order = inverse_qft(iqft, list(range(counting_qubits)), approximation_degree, do_swaps=False)
+    qc.compose(transpile_block(iqft, backend, optimization_level, cache), qubits=counting, inplace=True)
+
+    qc.metadata["counting_layout"] = [counting[q] for q in order]
+    qc.measure(qc.metadata["counting_layout"], counting)
+    return qc
@@ -1,57 +1,293 @@
 from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+from qiskit.circuit.library import DiagonalGate
 import numpy as np
 from Final_Project.grover import grover_iteration
+from Final_Project.oracle import oracle_diagonal
 
 
-def inverse_qft(circuit, qubits):
+def inverse_qft(circuit, qubits, approximation_degree=0, do_swaps=True):
     """
     Performs the Inverse Quantum Fourier Transform (IQFT).
     Purpose: To convert phase information stored in the counting qubits 
     into a measurable binary integer (m) which we then use to calculate the phase fraction (phi).
+
+    approximation_degree (d): drops the d smallest-angle rotation orders, i.e. every
+    controlled phase pi/2^k with k > t - 1 - d (Qiskit's QFT convention). With
+    d = t - 1 - ceil(log2 t) each qubit keeps O(log t) rotations: O(t log t) gates overall.
+    do_swaps: False skips the swap network (3 CNOTs per swap) and leaves the bits
+    reversed; measure bit i from the returned order instead.
+
+    Returns:
+        list: order[i] is the qubit holding bit i of the result
     """
     n = len(qubits)
-    # Reverse the order of qubits to match QFT mathematical convention
-    for i in range(n // 2):
-        circuit.swap(qubits[i], qubits[n - i - 1])
+    if do_swaps:
+        # Reverse the order of qubits to match QFT mathematical convention
+        for i in range(n // 2):
+            circuit.swap(qubits[i], qubits[n - i - 1])
+        wires = list(qubits)
+    else:
+        # Virtual swap: relabel the wires instead of moving the states
+        wires = list(reversed(qubits))
 
     # Apply controlled phase rotations
     for j in range(n):
         for m in range(j):
+            # Rotations by pi/2^(j-m) beyond the cutoff barely move the result
+            if j - m > n - 1 - approximation_degree:
+                continue
             # Apply negative rotations to 'undo' the QFT phase
             angle = -np.pi / (2 ** (j - m))
-            circuit.cp(angle, qubits[j], qubits[m])
-        circuit.h(qubits[j])
+            circuit.cp(angle, wires[j], wires[m])
+        circuit.h(wires[j])
+
+    # Bit i of the result sits on wires[i] (qubits[i] when the swaps were applied)
+    return wires
+
+
+def logarithmic_approximation_degree(counting_qubits):
+    """Approximation degree that keeps ceil(log2 t) rotation orders per qubit (O(t log t) gates)."""
+    return max(0, counting_qubits - max(1, int(np.ceil(np.log2(counting_qubits)))) - 1)
+
+
+def _is_mcx_on(operation, qubits, target):
+    # (Multi-)controlled X with all controls on |1> acting on 'target'
+    return (getattr(operation, "base_gate", None) is not None
+            and operation.base_gate.name == "x"
+            and operation.ctrl_state == 2 ** operation.num_ctrl_qubits - 1
+            and qubits[-1] == target)
+
+
+def kernel_controlled(circuit):
+    """
+    Adds a control (new qubit 0) to the phase kernels of 'circuit' only.
+
+    The oracles and the diffusion are all of the form B0 K1 B1 K2 ... Km Bm,
+    where the K are phase flips and the basis changes B multiply to the identity
+    (X masks, H layers and adder compute/uncompute). Controlling only the K is
+    then exact: with the control off the B cancel, with it on the circuit runs.
+    Kernels recognised: H . MCX . H on one target (MCZ), Z, DiagonalGate and the
+    global phase. Everything else is copied without a control.
+    """
+    qc = QuantumCircuit(circuit.num_qubits + 1, name="c-G")
+    control = qc.qubits[0]
+    qubit_map = {q: qc.qubits[i + 1] for i, q in enumerate(circuit.qubits)}
+
+    data = circuit.data
+    i = 0
+    while i < len(data):
+        operation = data[i].operation
+        qubits = [qubit_map[q] for q in data[i].qubits]
+
+        if (operation.name == "h" and i + 2 < len(data)
+                and _is_mcx_on(data[i + 1].operation, data[i + 1].qubits, data[i].qubits[0])
+                and data[i + 2].operation.name == "h" and data[i + 2].qubits == data[i].qubits):
+            # MCZ kernel: one more control on the MCX, the H pair cancels on its own
+            mcx_qubits = [qubit_map[q] for q in data[i + 1].qubits]
+            qc.h(qubits[0])
+            qc.mcx([control] + mcx_qubits[:-1], mcx_qubits[-1])
+            qc.h(qubits[0])
+            i += 3
+            continue
+
+        if operation.name == "z":
+            qc.cz(control, qubits[0])
+        elif operation.name == "diagonal":
+            # Control is the least significant index bit of the new diagonal: entry 2x + c
+            phases = np.array(operation.params, dtype=complex)
+            controlled = np.stack([np.ones(len(phases), dtype=complex), phases], axis=1).ravel()
+            qc.append(DiagonalGate(controlled.tolist()), [control] + qubits)
+        else:
+            qc.append(operation, qubits)
+        i += 1
+
+    if circuit.global_phase:
+        # A global phase becomes a relative phase on the control
+        qc.p(circuit.global_phase, control)
+
+    return qc
 
 
-def controlled_grover(oracle, power):
+def controlled_grover_base(oracle, n=None, control="full"):
+    """
+    Builds the single controlled Grover iteration c-G (control on qubit 0).
+
+    It is built once per oracle and shared by every power, so a counting circuit
+    holds one definition of c-G no matter how many counting qubits it has.
+    n: number of search qubits (defaults to all oracle qubits, see grover_iteration)
+    control: "full" controls every gate of G; "kernel" controls only the phase
+             flips of the oracle and the diffusion (see kernel_controlled)
+    """
+    # Diagonal (simulation-only) oracles get a dense-free controlled G
+    phases = oracle_diagonal(oracle)
+    if phases is not None:
+        return controlled_diagonal_grover(phases, 1)
+
+    # Construct the base Grover iteration: G = D * O
+    single_g = grover_iteration(oracle, n)
+
+    if control == "kernel":
+        return kernel_controlled(single_g).to_gate(label="c-G")
+    if control != "full":
+        raise ValueError(f"Unknown control mode: {control}")
+
+    # Control the circuit structure (gate by gate), never its matrix
+    return single_g.to_gate(label="G").control(1)
+
+
+def controlled_grover(oracle, power, n=None, base=None, control="full"):
     """
     Builds a Grover operator (G) raised to a power (2^i) and makes it 'Controlled'.
     
     Purpose: In Quantum Phase Estimation, we must apply the operator 
     periodically to create interference patterns in the counting register.
+    n: number of search qubits (defaults to all oracle qubits, see grover_iteration)
+    base: a prebuilt controlled_grover_base(oracle, n) to share between powers
+    control: "full" or "kernel", see controlled_grover_base
+
+    Controlled G^p is c-G repeated p times: every repetition references the same
+    gate object, so memory stays O(|G|) instead of forming the dense 2^n x 2^n
+    matrix that Gate.power() would build.
     """
+    if base is None:
+        base = controlled_grover_base(oracle, n, control)
 
-    # Construct the base Grover iteration: G = D * O
-    single_g = grover_iteration(oracle)
-    
-    # 2. Convert to a gate and raise to the required power
-    # This repeats the [Oracle + Diffusion] sequence 2^i times
-    g_gate = single_g.to_gate(label=f"G^{power}").power(power)
+    # This repeats the controlled [Oracle + Diffusion] sequence 2^i times
+    qc = QuantumCircuit(base.num_qubits, name=f"c-G^{power}")
+    for _ in range(power):
+        qc.append(base, range(base.num_qubits))
+
+    # Return controlled gate (1 control qubit). Setting the definition directly keeps
+    # the shared c-G reference (to_gate() would deep-copy every repetition).
+    gate = Gate(name=f"c-G^{power}", num_qubits=base.num_qubits, params=[])
+    gate.definition = qc
+    return gate
 
-    # Return controlled gate (1 control qubit)
-    return g_gate.control(1)
 
+def controlled_diagonal_grover(phases, power):
+    """
+    Controlled G^power for an oracle given as its phase vector (see subset_sum_oracle mode="diagonal").
 
-def quantum_counting_circuit(n, oracle, counting_qubits=4):
+    Qubit 0 is the control. Nothing is decomposed for Aer:
+        controlled O:  one DiagonalGate, diag(1, phase_x) interleaved over (control, x)
+        controlled D:  H^n X^n . MCPhase(pi) over control + search . X^n H^n
+    The H and X layers need no control because they cancel when the control is |0>.
+    """
+    N = len(phases)
+    n = N.bit_length() - 1
+
+    # Control is the least significant index bit: entry 2x + c
+    controlled_oracle = np.stack([np.ones(N, dtype=complex), phases], axis=1).ravel()
+    oracle_gate = DiagonalGate(controlled_oracle.tolist())
+    search = list(range(1, n + 1))
+
+    qc = QuantumCircuit(n + 1, name=f"c-G^{power}")
+    for _ in range(power):
+        qc.append(oracle_gate, range(n + 1))
+        qc.h(search)
+        qc.x(search)
+        qc.mcp(np.pi, search, 0)
+        qc.x(search)
+        qc.h(search)
+    return qc.to_gate()
+
+
+def required_counting_qubits(n, absolute_error=None, relative_error=None, success_probability=None,
+                             min_solutions=1):
+    """
+    A sufficient t for the counting estimate to meet an error bound on M with the given probability.
+
+    With T = 2^p, a phase known to 1/T gives (Brassard, Hoyer, Tapp)
+        |M_est - M| <= 2*pi*sqrt(M*(N - M)) / T + pi^2 * N / T^2
+    with probability >= 8/pi^2. p is the smallest precision meeting the bound in the
+    worst case (M = N/2 for an absolute error, M = min_solutions for a relative one),
+    and a success probability 1 - delta above 8/pi^2 adds ceil(log2(2 + 1/(2*delta)))
+    qubits (Nielsen & Chuang, eq. 5.35).
+
+    Both are textbook guarantees, so the result is an upper bound rather than the
+    minimum: with a success probability of 0.95-0.99 it typically overshoots the
+    smallest t that meets the bound by 2-3 qubits (4-8x the controlled-G depth).
+    When depth matters, check smaller t against analytic.counting_distribution.
+
+    Args:
+        n (int): Number of search qubits, N = 2^n
+        absolute_error (float): Allowed |M_est - M| (< 0.5 means the rounded M is exact)
+        relative_error (float): Allowed |M_est - M| / M, for M >= min_solutions
+        success_probability (float): Required probability, defaults to 8/pi^2
+        min_solutions (int): Smallest M the relative bound has to hold for
+
+    Returns:
+        int: counting_qubits
+
+    Raises:
+        ValueError: unless exactly one positive error bound is given, 1 <= min_solutions <= 2^n
+            and 0 < success_probability < 1
+    """
+    if (absolute_error is None) == (relative_error is None):
+        raise ValueError("Give exactly one of absolute_error and relative_error")
+    N = 2 ** n
+    if absolute_error is not None and not absolute_error > 0:
+        raise ValueError(f"absolute_error must be positive, got {absolute_error}")
+    if relative_error is not None and not relative_error > 0:
+        raise ValueError(f"relative_error must be positive, got {relative_error}")
+    if not 1 <= min_solutions <= N:
+        raise ValueError(f"min_solutions must be between 1 and 2^n = {N}, got {min_solutions}")
+    if success_probability is not None and not 0 < success_probability < 1:
+        raise ValueError(f"success_probability must be in (0, 1), got {success_probability}")
+
+    def worst_error(p):
+        T = 2 ** p
+        if absolute_error is not None:
+            return np.pi * N / T + np.pi ** 2 * N / T ** 2 - absolute_error
+        M = min_solutions
+        return (2 * np.pi * np.sqrt(M * (N - M)) / T + np.pi ** 2 * N / T ** 2) / M - relative_error
+
+    p = 1
+    while worst_error(p) > 0:
+        p += 1
+
+    if success_probability is not None and success_probability > 8 / np.pi ** 2:
+        delta = 1 - success_probability
+        p += int(np.ceil(np.log2(2 + 1 / (2 * delta))))
+    return p
+
+
+def quantum_counting_circuit(n, oracle, counting_qubits=None, control="full", approximation_degree=0,
+                             absolute_error=None, relative_error=None, success_probability=None,
+                             min_solutions=1):
     """
     The main architectural assembly for the Quantum Counting system.
     n: number of qubits in search register (where the subsets are, the length of weights)
     counting_qubits (t): qubits in the 'precision' register (the ruler)
+    oracle: any phase oracle whose first n qubits are the search register; extra
+            qubits (e.g. the sum register of subset_sum_adder_oracle) are ancillas
+            that start in |0> and are returned to |0> by the oracle
+    control: "full" controls all of G, "kernel" only its phase flips (see controlled_grover_base)
+    approximation_degree: rotation orders dropped from the inverse QFT (see inverse_qft)
+    absolute_error / relative_error, success_probability, min_solutions: derive counting_qubits
+            as a t sufficient for that bound (see required_counting_qubits); otherwise t defaults
+            to 4. Giving counting_qubits as well, or success_probability / min_solutions without
+            an error bound, raises ValueError
     """
-    # Total qubits: counting + search
-    qc = QuantumCircuit(counting_qubits + n, counting_qubits)
+    if absolute_error is not None or relative_error is not None:
+        if counting_qubits is not None:
+            raise ValueError("Give either counting_qubits or an error bound, not both")
+        counting_qubits = required_counting_qubits(n, absolute_error, relative_error, success_probability,
+                                                   min_solutions)
+    elif success_probability is not None or min_solutions != 1:
+        raise ValueError("success_probability and min_solutions need absolute_error or relative_error")
+    elif counting_qubits is None:
+        counting_qubits = 4
+
+    # Total qubits: counting + search (+ oracle ancillas)
+    qc = QuantumCircuit(counting_qubits + oracle.num_qubits, counting_qubits,
+                        metadata={"kind": "quantum_counting", "n": n, "counting_qubits": counting_qubits,
+                                  "approximation_degree": approximation_degree,
+                                  "oracle": dict(oracle.metadata or {})})
     counting = list(range(counting_qubits))
     search = list(range(counting_qubits, counting_qubits + n))
+    ancillas = list(range(counting_qubits + n, counting_qubits + oracle.num_qubits))
 
     # Initialize counting and search qubits
     qc.h(counting)
@@ -59,18 +295,91 @@ def quantum_counting_circuit(n, oracle, counting_qubits=4):
 
     # Apply controlled Grover iterations
     # Each counting qubit 'i' controls the application of Grover 2^i times.
+    base = controlled_grover_base(oracle, n, control)
     for i in range(counting_qubits):
         power = 2 ** i
-        controlled_G = controlled_grover(oracle, power)
-        qc.append(controlled_G, [counting[i]] + search)
+        controlled_G = controlled_grover(oracle, power, n, base=base)
+        qc.append(controlled_G, [counting[i]] + search + ancillas)
 
     # Apply inverse QFT on counting qubits
     # Extract the rotation frequency from the counting qubits
-    inverse_qft(qc, counting)
+    # (swap-free: the bit reversal is absorbed into the measurement map)
+    order = inverse_qft(qc, counting, approximation_degree, do_swaps=False)
+    qc.metadata["counting_layout"] = order
 
     # Measure
-    # Collapse the counting register into a binary string
-    qc.measure(counting, counting)
+    # Collapse the counting register into a binary string: bit i of m into clbit i
+    qc.measure(order, counting)
+    return qc
+
+
+def logical_counting_circuit(qc):
+    """
+    quantum_counting_circuit without its measurements, counting bits back in logical order.
+
+    The swap-free inverse QFT leaves bit i on qc.metadata["counting_layout"][i];
+    this re-applies that permutation as explicit swaps, so Statevector(result) has
+    the measured integer m on counting qubits 0..t-1 (for comparisons and tests).
+    """
+    qc = qc.remove_final_measurements(inplace=False)
+    where = list(qc.metadata["counting_layout"])  # where[i]: qubit holding bit i
+    holder = {q: i for i, q in enumerate(where)}   # holder[q]: bit held by qubit q
+    for i in range(len(where)):
+        q = where[i]
+        if q != i:
+            qc.swap(q, i)
+            other = holder[i]
+            holder[q], where[other] = other, q
+            holder[i], where[i] = i, i
+    return qc
+
+
+def iterative_counting_circuit(n, oracle, counting_qubits=4, control="full", approximation_degree=0):
+    """
+    Quantum counting with iterative (single-ancilla) phase estimation.
+
+    One control qubit replaces the t-qubit counting register and the inverse QFT:
+    each round prepares it in |+>, applies controlled G^(2^k) from the largest power
+    down, undoes the phase of the bits already measured with classically conditioned
+    rotations, then measures it through H and resets it. Round k = t-1 reads bit 0 of
+    the measured integer, round k = 0 reads bit t-1 (the semi-classical inverse QFT),
+    so clbit j holds bit j and the counts decode exactly like quantum_counting_circuit:
+    int(bitstring, 2) is the measured_value for estimate_solutions, with the same
+    outcome distribution. The simulated state is 1 + n (+ ancilla) qubits instead of t + n.
+
+    n: number of qubits in search register
+    counting_qubits (t): bits of precision, i.e. rounds
+    oracle: any phase oracle whose first n qubits are the search register (see quantum_counting_circuit)
+    control: "full" or "kernel", see controlled_grover_base
+    approximation_degree: correction orders dropped, the same cutoff as inverse_qft
+    """
+    # One control qubit + search (+ oracle ancillas), t classical bits
+    qc = QuantumCircuit(1 + oracle.num_qubits, counting_qubits,
+                        metadata={"kind": "iterative_counting", "n": n, "counting_qubits": counting_qubits,
+                                  "approximation_degree": approximation_degree,
+                                  "oracle": dict(oracle.metadata or {})})
+    search = list(range(1, 1 + n))
+    target_qubits = list(range(1, 1 + oracle.num_qubits))
+
+    qc.h(search)
+
+    base = controlled_grover_base(oracle, n, control)
+    for k in reversed(range(counting_qubits)):
+        bit = counting_qubits - 1 - k
+        qc.h(0)
+        qc.append(controlled_grover(oracle, 2 ** k, n, base=base), [0] + target_qubits)
+
+        # 2^k * phi = 0.b_bit b_(bit-1) ... b_0: remove the already known lower bits
+        for j in range(bit):
+            if bit - j > counting_qubits - 1 - approximation_degree:
+                continue
+            with qc.if_test((qc.clbits[j], 1)):
+                qc.p(-np.pi / 2 ** (bit - j), 0)
+
+        qc.h(0)
+        qc.measure(0, bit)
+        if k:
+            qc.reset(0)
     return qc
 
 
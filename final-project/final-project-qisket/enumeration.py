@@ -0,0 +1,183 @@
+import numpy as np
+
+# Number of index bits handled per vectorized chunk (2^20 sums = 8 MB of int64)
+DEFAULT_CHUNK_BITS = 20
+
+
+def subset_sum_table(weights):
+    """
+    Computes the subset sum of every bitstring over the given weights.
+
+    Index i of the returned array holds the sum of the weights whose bit is set
+    in i, using Qiskit's little-endian convention (bit k of i selects weights[k]).
+    The table is built by doubling: adding weight k to a copy of the table
+    covers every bitstring with bit k set.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+
+    Returns:
+        np.ndarray: int64 array of length 2^n with the subset sums
+    """
+    table = np.zeros(1, dtype=np.int64)
+    for w in weights:
+        table = np.concatenate((table, table + w))
+    return table
+
+
+def iter_subset_sum_chunks(weights, chunk_bits=DEFAULT_CHUNK_BITS):
+    """
+    Streams the 2^n subset sums in chunks of at most 2^chunk_bits entries.
+
+    The low 'chunk_bits' weights are tabulated once; every chunk is that table
+    shifted by the sum of one assignment of the remaining (high) weights, so
+    memory stays bounded no matter how large n is.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+        chunk_bits (int): log2 of the maximum chunk size
+
+    Yields:
+        tuple[int, np.ndarray]: (index of the first bitstring in the chunk, its subset sums)
+    """
+    low_bits = min(len(weights), chunk_bits)
+    low_table = subset_sum_table(weights[:low_bits])
+    high_table = subset_sum_table(weights[low_bits:])
+
+    for high, high_sum in enumerate(high_table):
+        yield high << low_bits, low_table + high_sum
+
+
+def marked_indices(weights, target, chunk_bits=DEFAULT_CHUNK_BITS):
+    """
+    Finds every bitstring whose selected weights sum to the target value.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+        target (int): Target subset sum
+        chunk_bits (int): log2 of the maximum chunk size
+
+    Returns:
+        np.ndarray: Sorted int64 array of the marked basis-state indices (little-endian)
+    """
+    low_bits = min(len(weights), chunk_bits)
+    low_table = subset_sum_table(weights[:low_bits])
+    high_table = subset_sum_table(weights[low_bits:])
+
+    # Compare the shared low table against the remaining target of each high assignment
+    # instead of materializing the shifted chunk.
+    found = []
+    for high, high_sum in enumerate(high_table):
+        hits = np.flatnonzero(low_table == target - high_sum)
+        if hits.size:
+            found.append(hits + (high << low_bits))
+
+    if not found:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(found).astype(np.int64)
+
+
+def index_to_bits(index, n):
+    """Converts a basis-state index into its little-endian bit tuple (bits[k] selects weights[k])."""
+    return tuple((int(index) >> k) & 1 for k in range(n))
+
+
+def subset_sum_histogram(weights):
+    """
+    Distinct subset sums and how many bitstrings reach each, without touching the 2^n bitstrings.
+
+    Sparse dynamic programming: every weight merges the (sum, count) table with a
+    copy shifted by the weight. Memory is O(number of distinct sums).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ascending int64 sums and their int64 counts
+    """
+    sums = np.zeros(1, dtype=np.int64)
+    counts = np.ones(1, dtype=np.int64)
+    for w in weights:
+        merged, inverse = np.unique(np.concatenate((sums, sums + w)), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((counts, counts)).astype(float)).astype(np.int64)
+        sums = merged
+    return sums, counts
+
+
+class SubsetSumIndex:
+    """
+    Buckets every bitstring by its subset sum with a chunked counting sort.
+
+    The bucket sizes come from subset_sum_histogram, then the 2^n sums are
+    streamed chunk by chunk and each chunk's indices are written straight into
+    their buckets, so any target afterwards is an O(1) slice instead of a fresh
+    2^n enumeration. Memory: one index per bitstring (int32 up to n=31, 4 bytes
+    each), O(distinct sums), and about 64 bytes of scratch per entry of the
+    current chunk (64 MiB at the default chunk_bits=20, whatever n is).
+
+    Attributes:
+        sums (np.ndarray): Distinct achievable subset sums, ascending
+        counts (np.ndarray): Number of bitstrings (M) for each entry of 'sums'
+    """
+
+    def __init__(self, weights, chunk_bits=DEFAULT_CHUNK_BITS):
+        self.n = len(weights)
+        self.sums, self.counts = subset_sum_histogram(weights)
+        self._starts = np.cumsum(self.counts) - self.counts
+
+        index_dtype = np.int32 if self.n < 31 else np.int64
+        self._order = np.empty(2 ** self.n, dtype=index_dtype)
+        cursor = self._starts.copy()
+        for first, chunk in iter_subset_sum_chunks(weights, chunk_bits):
+            # Chunks arrive in index order and the sort is stable, so buckets stay ascending
+            local = np.argsort(chunk, kind="stable")
+            buckets = np.searchsorted(self.sums, chunk[local])
+            present, offsets, sizes = np.unique(buckets, return_index=True, return_counts=True)
+            rank = np.arange(len(local)) - np.repeat(offsets, sizes)
+            self._order[cursor[buckets] + rank] = local + first
+            cursor[present] += sizes
+
+    def _bucket(self, target):
+        pos = np.searchsorted(self.sums, target)
+        if pos < len(self.sums) and self.sums[pos] == target:
+            return pos
+        return None
+
+    def count(self, target):
+        """Exact number of solutions M for 'target'."""
+        pos = self._bucket(target)
+        return 0 if pos is None else int(self.counts[pos])
+
+    def marked_indices(self, target):
+        """Sorted int64 array of the bitstrings summing to 'target' (same as marked_indices)."""
+        pos = self._bucket(target)
+        if pos is None:
+            return np.zeros(0, dtype=np.int64)
+        start = self._starts[pos]
+        return self._order[start:start + self.counts[pos]].astype(np.int64)
+
+    def histogram(self):
+        """Dictionary target -> M for every achievable subset sum."""
+        return dict(zip(self.sums.tolist(), self.counts.tolist()))
+
+
+def count_solutions(weights, target):
+    """
+    Number of subsets summing to 'target' without touching the 2^n bitstrings.
+
+    Pseudo-polynomial dynamic programming over the reachable sums:
+    O(n * sum(weights)) time and O(sum(weights)) memory, so n=40 is instant
+    as long as the weights stay moderate. Requires non-negative weights.
+    """
+    if any(w < 0 for w in weights):
+        # Negative weights shift the sum range; fall back to the enumeration engine
+        return len(marked_indices(weights, target))
+    if target < 0 or target > sum(weights):
+        return 0
+
+    # ways[s] = number of subsets of the weights seen so far with sum s (Python ints: no overflow)
+    ways = np.zeros(target + 1, dtype=object)
+    ways[0] = 1
+    for w in weights:
+        if w == 0:
+            ways = ways * 2
+        elif w <= target:
+            ways[w:] = ways[w:] + ways[:-w]
+    return int(ways[target])
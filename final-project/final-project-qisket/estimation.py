@@ -0,0 +1,94 @@
+import numpy as np
+from Final_Project.analytic import grover_eigenphases, qpe_distribution
+
+
+def counts_histogram(counts, counting_qubits=None):
+    """
+    Aer-style counts -> array of shot counts indexed by the measured integer m.
+
+    Returns:
+        tuple[np.ndarray, int]: (histogram of length 2^t, t)
+    """
+    if counting_qubits is None:
+        counting_qubits = len(next(iter(counts)))
+    histogram = np.zeros(2 ** counting_qubits)
+    for bitstring, count in counts.items():
+        histogram[int(bitstring, 2)] += count
+    return histogram, counting_qubits
+
+
+# Candidate rows evaluated at once by posterior_estimate (bounds the temporaries)
+CANDIDATE_CHUNK = 2 ** 14
+
+
+def likelihood_matrix(n, counting_qubits, candidates=None, outcomes=None):
+    """
+    P(m | M) for every candidate M (rows) and measured integer m (columns).
+
+    Same closed form as counting_distribution, vectorized over the candidates:
+    len(candidates) x len(outcomes) floats, outcomes defaulting to all 2^t integers.
+    Each full row already sums to 1 (two Fejer kernels weighted 1/2), so no renormalisation.
+    """
+    if candidates is None:
+        candidates = np.arange(2 ** n + 1)
+    phi_plus, phi_minus = grover_eigenphases(np.asarray(candidates, dtype=float), n)
+    return 0.5 * qpe_distribution(phi_plus[:, None], counting_qubits, outcomes) \
+        + 0.5 * qpe_distribution(phi_minus[:, None], counting_qubits, outcomes)
+
+
+def posterior_estimate(counts, n, counting_qubits=None, level=0.95, prior=None):
+    """
+    Estimates M from the whole counts histogram of a counting run instead of its top outcome.
+
+    Every shot contributes to the log-likelihood of every integer M in 0..N, so the
+    estimate uses all the information in the run and comes with an interval. The
+    likelihood is only evaluated at the observed outcomes (at most 'shots' columns)
+    and the candidates are streamed in chunks of CANDIDATE_CHUNK, so memory is
+    O(N) for the posterior itself plus a fixed chunk.
+
+    Args:
+        counts (dict): Bitstring (t bits, MSB first) -> count, as returned by get_counts()
+        n (int): Number of search qubits
+        counting_qubits (int): t, defaults to the bitstring length
+        level (float): Posterior mass of the credible interval
+        prior (np.ndarray): Prior weights over M = 0..N, defaults to uniform (MAP = ML)
+
+    Returns:
+        dict: M_map, M_ml, interval (lo, hi) of the highest-posterior set, its mass, and
+        the posterior array over M = 0..N
+    """
+    if counting_qubits is None:
+        counting_qubits = len(next(iter(counts)))
+    observed = {}
+    for bitstring, count in counts.items():
+        if count:
+            m = int(bitstring, 2)
+            observed[m] = observed.get(m, 0) + count
+    outcomes = np.fromiter(observed.keys(), dtype=np.int64)
+    shots = np.fromiter(observed.values(), dtype=float)
+
+    # log P(counts | M) up to the multinomial coefficient, one chunk of candidates at a time
+    candidates = 2 ** n + 1
+    log_likelihood = np.empty(candidates)
+    for start in range(0, candidates, CANDIDATE_CHUNK):
+        chunk = np.arange(start, min(start + CANDIDATE_CHUNK, candidates))
+        likelihoods = likelihood_matrix(n, counting_qubits, chunk, outcomes)
+        log_likelihood[chunk] = np.log(np.clip(likelihoods, 1e-300, None)) @ shots
+
+    log_posterior = log_likelihood if prior is None else log_likelihood + np.log(np.clip(prior, 1e-300, None))
+
+    posterior = np.exp(log_posterior - log_posterior.max())
+    posterior /= posterior.sum()
+
+    # Highest-posterior set: most probable M first until 'level' is reached
+    ranked = np.argsort(posterior)[::-1]
+    cumulative = np.cumsum(posterior[ranked])
+    included = ranked[:int(np.searchsorted(cumulative, level)) + 1]
+
+    return {
+        "M_map": int(np.argmax(posterior)),
+        "M_ml": int(np.argmax(log_likelihood)),
+        "interval": (int(included.min()), int(included.max())),
+        "mass": float(posterior[included].sum()),
+        "posterior": posterior,
+    }
@@ -1,14 +1,19 @@
 from qiskit import QuantumCircuit
 from Final_Project.diffusion import diffusion_operator
 
-def grover_iteration(oracle: QuantumCircuit) -> QuantumCircuit:
+def grover_iteration(oracle: QuantumCircuit, n: int = None) -> QuantumCircuit:
     """
     Builds one Grover iteration: G = D * O
+
+    n: number of search qubits. Defaults to all oracle qubits; arithmetic oracles
+    carry their ancillas after the first n qubits and the diffusion skips them.
     """
 
     # Size of the search space (n qubits)
-    n = oracle.num_qubits
-    qc = QuantumCircuit(n, name="GroverIteration")
+    if n is None:
+        n = oracle.num_qubits
+    qc = QuantumCircuit(oracle.num_qubits, name="GroverIteration",
+                        metadata={"kind": "grover_iteration", "n": n, "oracle": dict(oracle.metadata or {})})
 
     # Apply the Phase Oracle (O)
     # The Oracle 'marks' the correct subsets by flipping their phase to negative.
@@ -18,7 +23,7 @@ def grover_iteration(oracle: QuantumCircuit) -> QuantumCircuit:
     # Apply the Diffusion Operator (D)
     # The Diffusion operator (also called the 'Inversion about the Mean')
     # transforms those negative phases into increased probabilities.
-    qc.compose(diffusion_operator(n), inplace=True)
+    qc.compose(diffusion_operator(n), qubits=range(n), inplace=True)
 
     # Return the combined operator G
     return qc
\ No newline at end of file
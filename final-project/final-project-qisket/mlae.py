@@ -0,0 +1,159 @@
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.grover import grover_iteration
+from Final_Project.planner import plan_simulation, planned_simulator
+
+
+def exponential_schedule(rounds):
+    """Grover iteration counts 0, 1, 2, 4, ..., 2^(rounds-2) (the MLAE schedule of Suzuki et al.)."""
+    return [0] + [2 ** k for k in range(rounds - 1)]
+
+
+def grover_search_circuit(oracle, n, iterations):
+    """
+    H^n followed by 'iterations' uncontrolled Grover iterations, measuring the search register only.
+    """
+    grover = grover_iteration(oracle, n)
+    qc = QuantumCircuit(oracle.num_qubits, n)
+    qc.h(range(n))
+    for _ in range(iterations):
+        qc.compose(grover, inplace=True)
+    qc.measure(range(n), range(n))
+    return qc
+
+
+def count_hits(counts, weights, target):
+    """Shots whose measured subset sums to the target (checked classically, O(n) per outcome)."""
+    hits = 0
+    for bitstring, count in counts.items():
+        # Qiskit bitstrings are MSB first: bit k of the index selects weights[k]
+        index = int(bitstring, 2)
+        if sum(w for k, w in enumerate(weights) if (index >> k) & 1) == target:
+            hits += count
+    return hits
+
+
+def log_likelihood(theta, schedule, hits, shots):
+    """
+    Joint log-likelihood of the hit counts for angles 'theta' (any shape).
+
+    After m iterations a hit has probability sin^2((2m+1) * theta) with
+    sin^2(theta) = M/N; the sign of our diffusion only flips the global phase.
+    """
+    theta = np.asarray(theta, dtype=float)
+    total = np.zeros_like(theta)
+    for m, h in zip(schedule, hits):
+        p = np.clip(np.sin((2 * m + 1) * theta) ** 2, 1e-15, 1 - 1e-15)
+        total += h * np.log(p) + (shots - h) * np.log(1 - p)
+    return total
+
+
+def fit_theta(schedule, hits, shots, grid_points=None):
+    """
+    Maximum-likelihood theta in [0, pi/2].
+
+    The likelihood oscillates with period ~ pi / (2 * max(m) + 1), so a grid
+    that resolves every period is searched first and the best cell is then
+    refined by golden-section search.
+    """
+    if grid_points is None:
+        grid_points = 50 * (2 * max(schedule) + 1) + 1000
+    grid = np.linspace(0.0, np.pi / 2, grid_points)
+    best = int(np.argmax(log_likelihood(grid, schedule, hits, shots)))
+
+    lo, hi = grid[max(best - 1, 0)], grid[min(best + 1, grid_points - 1)]
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(60):
+        a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        if log_likelihood(a, schedule, hits, shots) >= log_likelihood(b, schedule, hits, shots):
+            hi = b
+        else:
+            lo = a
+    return float((lo + hi) / 2)
+
+
+def fisher_theta_error(theta, schedule, shots):
+    """
+    Cramer-Rao standard deviation of theta: each shot after m iterations carries
+    Fisher information 4 * (2m+1)^2, independent of theta.
+    """
+    information = sum(4 * shots * (2 * m + 1) ** 2 for m in schedule)
+    return 1 / np.sqrt(information)
+
+
+def qpe_oracle_calls(theta_error, shots=1):
+    """
+    Oracle calls of quantum_counting_circuit for the same angular error.
+
+    The QPE estimate of theta = pi * phi is within pi / 2^t with probability
+    >= 8/pi^2, so t = ceil(log2(pi / theta_error)) counting qubits and
+    2^t - 1 applications of (controlled) G per shot.
+
+    Returns:
+        tuple[int, int]: (counting qubits t, oracle calls)
+    """
+    t = max(1, int(np.ceil(np.log2(np.pi / theta_error))))
+    return t, shots * (2 ** t - 1)
+
+
+def ml_amplitude_estimation(weights, target, schedule=None, shots=100, mode="per_state",
+                            backend=None, seed=None, budget=None, allow_mps=False):
+    """
+    Estimates the number of solutions M with maximum-likelihood amplitude estimation.
+
+    Runs plain Grover circuits (no controlled G, no inverse QFT) for every
+    iteration count in 'schedule', counts the shots that land on a solution,
+    and fits M = N * sin^2(theta) by maximizing the joint likelihood.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+        target (int): Target subset sum
+        schedule (list[int]): Grover iteration counts, defaults to exponential_schedule(5)
+        shots (int): Shots per schedule entry
+        mode (str): Oracle construction, see subset_sum_oracle
+        backend: Simulator to run on, defaults to the one plan_simulation picks for 'budget'
+        seed (int): Simulator seed
+        budget (int): Memory budget in bytes for the default backend
+        allow_mps (bool): Accept a truncated MPS simulation when the statevector does not
+            fit the budget (otherwise MemoryError); the result is then flagged approximate
+
+    Returns:
+        dict: M (rounded), M_float, theta, theta_error, hits, oracle_calls, the
+        counting qubits and oracle calls QPE needs for the same theta_error, and
+        approximate (the hits came from a truncated MPS simulation)
+    """
+    if schedule is None:
+        schedule = exponential_schedule(5)
+
+    n = len(weights)
+    oracle = subset_sum_oracle(weights, target, mode=mode)
+    approximate = False
+    if backend is None:
+        plan = plan_simulation(oracle.num_qubits, budget=budget, allow_mps=allow_mps,
+                               label=f"MLAE n={n} target={target}")
+        backend = planned_simulator(plan)
+        approximate = plan["approximate"]
+
+    circuits = [grover_search_circuit(oracle, n, m) for m in schedule]
+    result = backend.run(transpile(circuits, backend, optimization_level=1), shots=shots,
+                         seed_simulator=seed).result()
+    hits = [count_hits(result.get_counts(i), weights, target) for i in range(len(schedule))]
+
+    theta = fit_theta(schedule, hits, shots)
+    M_float = 2 ** n * np.sin(theta) ** 2
+    theta_error = fisher_theta_error(theta, schedule, shots)
+    qpe_counting_qubits, qpe_calls = qpe_oracle_calls(theta_error)
+
+    return {
+        "M": int(round(M_float)),
+        "M_float": float(M_float),
+        "theta": theta,
+        "theta_error": float(theta_error),
+        "hits": hits,
+        # One oracle call per Grover iteration per shot
+        "oracle_calls": shots * sum(schedule),
+        "qpe_counting_qubits": qpe_counting_qubits,
+        "qpe_oracle_calls": qpe_calls,
+        "approximate": approximate,
+    }
@@ -1,7 +1,11 @@
-from qiskit import QuantumCircuit
-from itertools import product
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.circuit import ParameterVector
+from qiskit.circuit.library import DiagonalGate
+from Final_Project.enumeration import marked_indices, index_to_bits, SubsetSumIndex
+from Final_Project.synthesis import esop_cover, append_esop_oracle, gray_tour, append_gray_oracle, phase_flip
 
-def subset_sum_oracle(weights, target):
+def subset_sum_oracle(weights, target, mode="per_state"):
     """
     Builds a phase oracle for the subset sum problem.
 
@@ -11,6 +15,11 @@ def subset_sum_oracle(weights, target):
     Args:
         weights (list[int]): The set of numbers (e.g., [1,2,3])
         target (int): Target subset sum
+        mode (str): Oracle construction
+            "per_state": one full n-qubit MCZ per valid bitstring
+            "esop": minimized ESOP cover, one smaller MCZ per cube
+            "gray": per-state MCZs along a Gray-code tour, toggling only differing bits
+            "diagonal": a single +-1 DiagonalGate (simulation only, Aer runs it natively)
 
     Returns:
         QuantumCircuit: Oracle circuit that flips phase of valid states
@@ -18,20 +27,51 @@ def subset_sum_oracle(weights, target):
 
      # Number of qubits = number of elements in the set
     n = len(weights)
-    # Create quantum circuit with n qubits
-    qc = QuantumCircuit(n, name="SubsetSumOracle")
 
     # Find all bitstrings that satisfy subset sum
-    valid_states = []
+    # (vectorized over all 2^n subsets, streamed in bounded-size chunks)
+    indices = marked_indices(weights, target)
+
+    qc = oracle_from_indices(indices, n, mode)
+    qc.metadata["weights"] = list(weights)
+    qc.metadata["target"] = target
+    return qc
+
+
+def oracle_from_indices(indices, n, mode="per_state"):
+    """
+    Builds the phase oracle that flips exactly the given basis states.
+
+    Args:
+        indices (np.ndarray): Marked basis-state indices (little-endian)
+        n (int): Number of qubits
+        mode (str): Oracle construction, see subset_sum_oracle
+
+    Returns:
+        QuantumCircuit: Oracle circuit that flips phase of the marked states
+    """
+    # Create quantum circuit with n qubits
+    # (the metadata lets structure-aware simulators skip the gates entirely)
+    qc = QuantumCircuit(n, name="SubsetSumOracle", metadata={"marked_count": len(indices)})
 
-    # Generate all possible bitstrings of length n
-    for bits in product([0, 1], repeat=n):
-        # Compute subset sum for this bitstring
-        subset_sum = sum(w for b, w in zip(bits, weights) if b)
+    if mode == "esop":
+        # Cubes with don't-cares only control on their literals
+        append_esop_oracle(qc, esop_cover(indices, n))
+        return qc
+    if mode == "gray":
+        # Successive states share most of their X mask, so only the differences are applied
+        append_gray_oracle(qc, gray_tour(indices, n))
+        return qc
+    if mode == "diagonal":
+        # The oracle is diag(+-1): state it directly instead of decomposing MCZs
+        phases = np.ones(2 ** n)
+        phases[indices] = -1
+        qc.append(DiagonalGate(phases.tolist()), range(n))
+        return qc
+    if mode != "per_state":
+        raise ValueError(f"Unknown oracle mode: {mode}")
 
-        # If it matches the target, mark as valid
-        if subset_sum == target:
-            valid_states.append(bits)
+    valid_states = [index_to_bits(idx, n) for idx in indices]
 
     # Mark each valid state with a phase flip
     for state in valid_states:
@@ -56,4 +96,187 @@ def subset_sum_oracle(weights, target):
             if bit == 0:
                 qc.x(i)
 
-    return qc
\ No newline at end of file
+    return qc
+
+
+def batch_subset_sum_oracles(weights, targets=None, mode="per_state", index=None):
+    """
+    Builds the oracles for many targets from a single pass over the 2^n subsets.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+        targets (Iterable[int]): Targets to build; defaults to every achievable subset sum
+        mode (str): Oracle construction, see subset_sum_oracle
+        index (SubsetSumIndex): Precomputed bucket index to reuse across calls
+
+    Returns:
+        dict: target -> (QuantumCircuit oracle, exact number of solutions M)
+    """
+    if index is None:
+        index = SubsetSumIndex(weights)
+    if targets is None:
+        targets = index.sums.tolist()
+
+    n = len(weights)
+    oracles = {}
+    for target in targets:
+        indices = index.marked_indices(target)
+        oracle = oracle_from_indices(indices, n, mode)
+        oracle.metadata.update(weights=list(weights), target=target)
+        oracles[target] = (oracle, len(indices))
+    return oracles
+
+
+def oracle_diagonal(oracle):
+    """
+    Returns the phase vector of a diagonal-mode oracle, or None for gate-based oracles.
+
+    The vector is indexed by the oracle's own qubits, so a DiagonalGate appended on
+    permuted wires (e.g. a relabelled cached oracle) is permuted back.
+    """
+    if len(oracle.data) != 1:
+        return None
+    instruction = oracle.data[0]
+    if instruction.operation.name != "diagonal" or len(instruction.qubits) != oracle.num_qubits:
+        return None
+    phases = np.array(instruction.operation.params, dtype=complex) * np.exp(1j * oracle.global_phase)
+
+    # Gate qubit k sits on oracle qubit wires[k]: entry x of the oracle is entry y of the gate,
+    # where bit k of y is bit wires[k] of x
+    wires = [oracle.find_bit(q).index for q in instruction.qubits]
+    if wires == list(range(oracle.num_qubits)):
+        return phases
+    x = np.arange(len(phases))
+    y = np.zeros_like(x)
+    for k, wire in enumerate(wires):
+        y |= ((x >> wire) & 1) << k
+    return phases[y]
+
+
+def sum_register_size(weights, target):
+    """Bits needed so neither the largest subset sum nor the target wraps around."""
+    return max(1, max(sum(weights), target).bit_length())
+
+
+def _phase_sum_circuit(weights, sum_bits):
+    """
+    Reversibly computes |x>|0> -> |x>|sum of selected weights> (Draper-style phase adder).
+
+    The sum register starts in |0>, so its Fourier transform is just H on every
+    qubit. Each search qubit then adds its weight as controlled phase rotations
+    (qubit j of the sum register accumulates the phase 2*pi*sum / 2^(j+1)),
+    and a swap-free inverse QFT turns those phases back into the binary sum,
+    least significant bit on sum[0].
+    """
+    n = len(weights)
+    search = QuantumRegister(n, "search")
+    sum_reg = QuantumRegister(sum_bits, "sum")
+    qc = QuantumCircuit(search, sum_reg, name="SubsetSum")
+
+    qc.h(sum_reg)
+
+    # Controlled constant additions: n * sum_bits rotations at most
+    for i, w in enumerate(weights):
+        for j in range(sum_bits):
+            # Only w mod 2^(j+1) affects qubit j; skip rotations that are multiples of 2*pi
+            residue = w % (2 ** (j + 1))
+            if residue:
+                qc.cp(np.pi * residue / 2 ** j, search[i], sum_reg[j])
+
+    # Inverse QFT (no swaps): decode bit j after removing the lower bits' phase contributions
+    for j in range(sum_bits):
+        for m in range(j):
+            qc.cp(-np.pi / 2 ** (j - m), sum_reg[m], sum_reg[j])
+        qc.h(sum_reg[j])
+
+    return qc
+
+
+def subset_sum_adder_oracle(weights, target):
+    """
+    Builds an arithmetic phase oracle for the subset sum problem.
+
+    Instead of enumerating the valid bitstrings, the circuit computes the subset
+    sum into an ancilla register, flips the phase when it equals the target and
+    uncomputes the sum. Its size is O(n * s + s^2) with s = log2(sum(weights)),
+    independent of the number of solutions.
+
+    Args:
+        weights (list[int]): The set of non-negative numbers (e.g., [1,2,3])
+        target (int): Target subset sum
+
+    Returns:
+        QuantumCircuit: Oracle on n search qubits (first) followed by the
+        sum-register ancillas, which must start and end in |0>
+    """
+    if any(w < 0 for w in weights) or target < 0:
+        raise ValueError("The adder oracle requires non-negative weights and target")
+
+    n = len(weights)
+    sum_bits = sum_register_size(weights, target)
+    compute = _phase_sum_circuit(weights, sum_bits)
+
+    qc = QuantumCircuit(*compute.qregs, name="SubsetSumAdderOracle",
+                        metadata={"weights": list(weights), "target": target})
+    sum_reg = qc.qregs[1]
+
+    # Forward compute the sum of the selected subset
+    qc.compose(compute, inplace=True)
+
+    # Equality check: map |target> to |11...1> and flip its phase
+    zeros = [sum_reg[j] for j in range(sum_bits) if not (target >> j) & 1]
+    if zeros:
+        qc.x(zeros)
+    phase_flip(qc, sum_reg)
+    if zeros:
+        qc.x(zeros)
+
+    # Reverse compute the sum to clean up the ancillas
+    qc.compose(compute.inverse(), inplace=True)
+
+    return qc
+
+
+def subset_sum_adder_oracle_template(weights):
+    """
+    Builds the adder oracle for 'weights' with the target left as a parameter.
+
+    Only the comparator's X layer depends on the target. Each sum qubit j gets
+    RX(theta_j) before the phase flip and RX(-theta_j) after it, which is X...X
+    for theta_j = pi and the identity for theta_j = 0, so the circuit can be
+    transpiled once and bound per target with target_flip_values.
+
+    Args:
+        weights (list[int]): The set of non-negative numbers (e.g., [1,2,3])
+
+    Returns:
+        tuple[QuantumCircuit, ParameterVector]: Oracle (same layout as
+        subset_sum_adder_oracle) and the comparator angles theta_j
+    """
+    if any(w < 0 for w in weights):
+        raise ValueError("The adder oracle requires non-negative weights and target")
+
+    sum_bits = sum_register_size(weights, 0)
+    compute = _phase_sum_circuit(weights, sum_bits)
+    theta = ParameterVector("target_flip", sum_bits)
+
+    qc = QuantumCircuit(*compute.qregs, name="SubsetSumAdderOracle",
+                        metadata={"weights": list(weights), "target": None})
+    sum_reg = qc.qregs[1]
+
+    qc.compose(compute, inplace=True)
+    for j in range(sum_bits):
+        qc.rx(theta[j], sum_reg[j])
+    phase_flip(qc, sum_reg)
+    for j in range(sum_bits):
+        qc.rx(-theta[j], sum_reg[j])
+    qc.compose(compute.inverse(), inplace=True)
+
+    return qc, theta
+
+
+def target_flip_values(target, sum_bits):
+    """Comparator angles for 'target': pi where the target bit is 0 (apply X), 0 where it is 1."""
+    if not 0 <= target < 2 ** sum_bits:
+        raise ValueError(f"Target {target} does not fit in a {sum_bits}-bit sum register")
+    return [0.0 if (target >> j) & 1 else np.pi for j in range(sum_bits)]
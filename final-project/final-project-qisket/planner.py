@@ -0,0 +1,147 @@
+import logging
+import os
+
+from Final_Project.oracle import sum_register_size
+
+logger = logging.getLogger(__name__)
+
+# Bytes per amplitude
+AMPLITUDE_BYTES = {"double": 16, "single": 8}
+
+# Bond dimension assumed for matrix-product-state estimates (and passed to Aer as its cap)
+DEFAULT_MAX_BOND_DIMENSION = 256
+
+# Simulators keep scratch copies next to the state: budget for this multiple of the state itself
+OVERHEAD_FACTOR = 2
+
+
+def default_memory_budget():
+    """
+    Memory budget in bytes: FINAL_PROJECT_MEMORY_BUDGET if set, otherwise half of physical RAM.
+    """
+    configured = os.environ.get("FINAL_PROJECT_MEMORY_BUDGET")
+    if configured:
+        return int(float(configured))
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (ValueError, OSError, AttributeError):
+        return 4 * 2 ** 30
+
+
+def estimate_memory(num_qubits, method="statevector", precision="double", max_bond_dimension=None,
+                    counting_qubits=None):
+    """
+    Peak memory in bytes of simulating 'num_qubits' qubits with 'method'.
+
+        statevector:           2^q amplitudes
+        matrix_product_state:  q tensors of 2 * chi^2 amplitudes (chi capped at 2^(q/2))
+        analytic:              the 2^t x 2 subspace state of the counting register
+    each times OVERHEAD_FACTOR.
+    """
+    amplitude = AMPLITUDE_BYTES[precision]
+    if method == "statevector":
+        amplitudes = 2 ** num_qubits
+    elif method == "matrix_product_state":
+        chi = max_bond_dimension or DEFAULT_MAX_BOND_DIMENSION
+        chi = min(chi, 2 ** (num_qubits // 2))
+        amplitudes = num_qubits * 2 * chi ** 2
+    elif method == "analytic":
+        amplitudes = 2 * 2 ** (counting_qubits or 0)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return OVERHEAD_FACTOR * amplitude * amplitudes
+
+
+def plan_simulation(num_qubits, precision="double", budget=None, counting_qubits=None, analytic=False,
+                    allow_mps=False, max_bond_dimension=None, label=""):
+    """
+    Picks how to simulate a circuit within a memory budget, and logs the decision.
+
+    Preference order: exact statevector, the analytic counting path (exact, only when
+    'analytic' is True, i.e. the caller can derive M), matrix-product state, then refusal.
+
+    MPS is only considered when the caller opts in with allow_mps: the state is
+    truncated at max_bond_dimension, and counting circuits are highly entangled, so
+    a capped MPS result can be far from the exact distribution. Such plans are
+    flagged approximate and logged at WARNING level.
+
+    Args:
+        num_qubits (int): Width of the circuit
+        precision (str): "double" or "single"
+        budget (int): Bytes, defaults to default_memory_budget()
+        counting_qubits (int): t, for the analytic estimate
+        analytic (bool): Whether the analytic counting path is available
+        allow_mps (bool): Whether an approximate MPS simulation is acceptable
+        label (str): Instance description for the log line
+
+    Returns:
+        dict: method ("statevector", "analytic", "matrix_product_state" or "refuse"),
+        approximate (True for an MPS plan whose bond cap is below 2^(q/2)), bytes
+        (estimate for that method), budget and the statevector estimate.
+        A refusal is returned as a plan; require_plan turns it into a MemoryError
+    """
+    budget = default_memory_budget() if budget is None else budget
+    statevector = estimate_memory(num_qubits, "statevector", precision)
+
+    candidates = [("statevector", statevector)]
+    if analytic:
+        candidates.append(("analytic", estimate_memory(num_qubits, "analytic", precision,
+                                                       counting_qubits=counting_qubits)))
+    if allow_mps:
+        candidates.append(("matrix_product_state",
+                           estimate_memory(num_qubits, "matrix_product_state", precision, max_bond_dimension)))
+
+    method, needed = next(((m, b) for m, b in candidates if b <= budget), ("refuse", statevector))
+    chi = max_bond_dimension or DEFAULT_MAX_BOND_DIMENSION
+    # The bond dimension of an exact MPS is at most 2^(q/2); below that the state is truncated
+    approximate = method == "matrix_product_state" and chi < 2 ** (num_qubits // 2)
+    plan = {"method": method, "approximate": approximate, "bytes": needed, "budget": budget,
+            "statevector_bytes": statevector, "num_qubits": num_qubits, "precision": precision,
+            "max_bond_dimension": chi}
+
+    log = logger.warning if method in ("refuse", "matrix_product_state") else logger.info
+    log("%s%d qubits (%s): statevector needs %.3g MiB of a %.3g MiB budget -> %s%s",
+        f"{label}: " if label else "", num_qubits, precision, statevector / 2 ** 20, budget / 2 ** 20, method,
+        f" (approximate, bond dimension {chi})" if approximate else "")
+    return plan
+
+
+def plan_counting(weights, target, counting_qubits, mode="per_state", precision="double", budget=None,
+                  allow_mps=False):
+    """
+    plan_simulation for the counting circuit of a subset-sum instance, before building it.
+
+    Width = t + n (+ the sum register for the adder oracle). The analytic path is always
+    available here because M follows from the weights and target (see SubspaceSimulator).
+    """
+    n = len(weights)
+    width = counting_qubits + n + (sum_register_size(weights, target) if mode == "adder" else 0)
+    return plan_simulation(width, precision, budget, counting_qubits=counting_qubits, analytic=True,
+                           allow_mps=allow_mps, label=f"counting n={n} t={counting_qubits} target={target}")
+
+
+def require_plan(plan):
+    """Returns 'plan' unless it is a refusal, which raises MemoryError before anything is allocated."""
+    if plan["method"] == "refuse":
+        raise MemoryError(f"{plan['num_qubits']} qubits need {plan['statevector_bytes'] / 2 ** 30:.3g} GiB "
+                          f"as a statevector, over the {plan['budget'] / 2 ** 30:.3g} GiB budget")
+    return plan
+
+
+def planned_simulator(plan, **options):
+    """
+    AerSimulator configured for a statevector or MPS plan, its memory capped at the plan's budget.
+
+    Raises:
+        ValueError: for analytic plans (there is nothing to simulate)
+        MemoryError: for refusals
+    """
+    require_plan(plan)
+    if plan["method"] == "analytic":
+        raise ValueError("Analytic plans do not use a simulator")
+
+    from qiskit_aer import AerSimulator
+    options.setdefault("max_memory_mb", max(1, plan["budget"] // 2 ** 20))
+    if plan["method"] == "matrix_product_state":
+        options.setdefault("matrix_product_state_max_bond_dimension", plan["max_bond_dimension"])
+    return AerSimulator(method=plan["method"], precision=plan["precision"], **options)
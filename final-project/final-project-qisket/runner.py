@@ -0,0 +1,298 @@
+import warnings
+from collections import Counter, OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+from qiskit import transpile
+from Final_Project.analytic import counts_from_probabilities
+from Final_Project.cache import cached_counting_circuit, circuit_fingerprint
+from Final_Project.counting import estimate_solutions
+from Final_Project.enumeration import count_solutions
+from Final_Project.planner import plan_counting, plan_simulation, planned_simulator, require_plan
+from Final_Project.subspace import SubspaceSimulator
+
+
+def decoded_counts(counts, n, counting_qubits):
+    """
+    Groups Aer-style counts by the M that estimate_solutions decodes from each outcome.
+
+    The two Grover eigenphases put their peaks at m and 2^t - m, which decode to
+    the same M, so the vote is taken over M rather than over raw bitstrings.
+    """
+    votes = Counter()
+    for bitstring, count in counts.items():
+        votes[estimate_solutions(int(bitstring, 2), n, counting_qubits)] += count
+    return votes
+
+
+def leading_margin(votes):
+    """
+    z-score of the leading M against the runner-up: (c1 - c2) / sqrt(c1 + c2).
+
+    Conditioned on a shot landing on one of the two, it is a fair coin under the
+    hypothesis that they are equally likely, so the score is a one-sided normal test.
+    """
+    ranked = votes.most_common(2)
+    c1 = ranked[0][1]
+    c2 = ranked[1][1] if len(ranked) > 1 else 0
+    return (c1 - c2) / (c1 + c2) ** 0.5
+
+
+# (weights, target) instances the single-precision guard compares against double precision
+CALIBRATION_SET = [
+    ([1, 2, 3], 3),
+    ([1, 1, 1, 1], 2),
+    ([2, 2, 2], 1),
+    ([1], 1),
+    ([3, 5, 7, 2, 8, 1], 11),
+]
+
+# Guard verdicts already computed in this process, keyed by (counting_qubits, tolerance)
+_PRECISION_CHECKS = {}
+
+
+def counting_simulator(precision="double", **options):
+    """AerSimulator for counting runs; precision="single" stores the statevector as complex64."""
+    if precision not in ("double", "single"):
+        raise ValueError(f"Unknown precision: {precision}")
+    from qiskit_aer import AerSimulator
+    return AerSimulator(precision=precision, **options)
+
+
+def precision_guard(counting_qubits=6, tolerance=1e-4, calibration=None):
+    """
+    Compares single- and double-precision counting on a calibration set.
+
+    Each instance's counting-register marginal is simulated in both precisions;
+    single precision passes when every outcome probability agrees within
+    'tolerance' and the most likely outcome decodes to the same M.
+
+    Returns:
+        dict: passed, max_probability_error and the instances whose M disagreed
+    """
+    calibration = CALIBRATION_SET if calibration is None else calibration
+    single = MarginalSampler(counting_simulator("single"))
+    double = MarginalSampler(counting_simulator("double"))
+
+    max_error = 0.0
+    mismatches = []
+    for weights, target in calibration:
+        n = len(weights)
+        qc = cached_counting_circuit(weights, target, counting_qubits, control="kernel")
+        p_single, p_double = single.marginal(qc), double.marginal(qc)
+        max_error = max(max_error, float(np.max(np.abs(p_single - p_double))))
+        if estimate_solutions(int(np.argmax(p_single)), n, counting_qubits) != \
+                estimate_solutions(int(np.argmax(p_double)), n, counting_qubits):
+            mismatches.append((weights, target))
+
+    return {"passed": max_error <= tolerance and not mismatches,
+            "max_probability_error": max_error, "mismatches": mismatches}
+
+
+def checked_precision(precision, counting_qubits=6, tolerance=1e-4):
+    """
+    'precision' if it is safe, running precision_guard once per process for single precision.
+
+    A failed guard warns and falls back to double precision.
+    """
+    if precision != "single":
+        return precision
+    key = (counting_qubits, tolerance)
+    if key not in _PRECISION_CHECKS:
+        _PRECISION_CHECKS[key] = precision_guard(counting_qubits, tolerance)
+    report = _PRECISION_CHECKS[key]
+    if not report["passed"]:
+        warnings.warn(f"Single precision failed the calibration check ({report}); using double precision")
+        return "double"
+    return "single"
+
+
+class MarginalSampler:
+    """
+    Samples noiseless counts from a cached pre-measurement marginal.
+
+    The unitary part of a circuit is simulated once: its final measurements are
+    replaced by an Aer save_probabilities over the measured qubits, and that
+    marginal is kept in a bounded LRU keyed by circuit_fingerprint. Any number of
+    shots, with any seed, is then a NumPy multinomial draw. Only valid without
+    noise and for circuits whose measurements are all final (not the iterative
+    phase-estimation circuits).
+
+    Fingerprinting re-hashes the whole circuit (seconds for a large transpiled one),
+    so repeated draws should compute key = circuit_fingerprint(circuit) once and
+    pass it to marginal / sample_counts / is_approximate.
+
+    A circuit whose statevector does not fit the memory budget raises MemoryError,
+    unless allow_mps is set: it is then simulated as a truncated matrix-product
+    state and is_approximate reports it.
+    """
+
+    def __init__(self, backend=None, max_entries=128, allow_mps=False):
+        if backend is None:
+            backend = counting_simulator()
+        self.backend = backend
+        self.max_entries = max_entries
+        self.allow_mps = allow_mps
+        self._marginals = OrderedDict()
+        # Fingerprints of the cached marginals that came from a truncated simulation
+        self._approximate = set()
+        self.hits = 0
+        self.misses = 0
+
+    def marginal(self, circuit, key=None):
+        """
+        Probabilities of the measured integer (clbit i = bit i), simulated on the first request.
+
+        key: circuit_fingerprint(circuit), computed here when not given
+        """
+        key = circuit_fingerprint(circuit) if key is None else key
+        if key in self._marginals:
+            self._marginals.move_to_end(key)
+            self.hits += 1
+            return self._marginals[key]
+
+        self.misses += 1
+        probabilities, approximate = self._simulate(circuit)
+        self._marginals[key] = probabilities
+        if approximate:
+            self._approximate.add(key)
+        while len(self._marginals) > self.max_entries:
+            evicted, _ = self._marginals.popitem(last=False)
+            self._approximate.discard(evicted)
+        return probabilities
+
+    def is_approximate(self, circuit, key=None):
+        """Whether the cached marginal of 'circuit' came from a truncated MPS simulation."""
+        return (circuit_fingerprint(circuit) if key is None else key) in self._approximate
+
+    def _simulate(self, circuit):
+        # Clbit -> measured qubit, read from the final measurements
+        measured = {}
+        for instruction in circuit.data:
+            if instruction.operation.name == "measure":
+                measured[circuit.find_bit(instruction.clbits[0]).index] = \
+                    circuit.find_bit(instruction.qubits[0]).index
+
+        unitary = circuit.remove_final_measurements(inplace=False)
+        if any(instruction.operation.name in ("measure", "reset", "if_else") for instruction in unitary.data):
+            raise ValueError("MarginalSampler needs a circuit whose measurements are all final")
+        if sorted(measured) != list(range(circuit.num_clbits)):
+            raise ValueError("Every classical bit must be measured exactly once")
+
+        # Refuse before allocating, or fall back to MPS when the caller accepts approximate marginals
+        precision = getattr(self.backend.options, "precision", "double")
+        plan = require_plan(plan_simulation(unitary.num_qubits, precision, allow_mps=self.allow_mps,
+                                            label="marginal"))
+        backend = self.backend if plan["method"] == "statevector" else planned_simulator(plan)
+
+        # save_probabilities lists its first qubit as the least significant bit, like the clbits
+        unitary.save_probabilities([measured[c] for c in range(circuit.num_clbits)])
+        # (a no-op pass for circuits that are already transpiled, e.g. from cached_counting_circuit)
+        compiled = transpile(unitary, backend, optimization_level=1)
+        probabilities = np.asarray(backend.run(compiled).result().data(0)["probabilities"])
+        return probabilities / probabilities.sum(), plan["approximate"]
+
+    def sample_counts(self, circuit, shots=1024, seed=None, key=None):
+        """Aer-style counts of 'shots' draws from the cached marginal (key as in marginal)."""
+        return counts_from_probabilities(self.marginal(circuit, key), circuit.num_clbits, shots, seed)
+
+
+def sequential_threshold(confidence, looks):
+    """
+    z threshold that keeps 'confidence' over 'looks' repeated tests (Bonferroni).
+
+    Stopping at the first of several looks whose one-sided z clears inv_cdf(confidence)
+    fails more often than 1 - confidence; splitting the error rate evenly over the
+    looks bounds the overall chance of a premature winner by 1 - confidence.
+    """
+    return NormalDist().inv_cdf(1 - (1 - confidence) / max(1, looks))
+
+
+def adaptive_counting_run(weights, target, counting_qubits=6, backend=None, batch_shots=16,
+                          max_shots=1024, confidence=0.99, min_shots=32, mode="per_state",
+                          control="kernel", optimization_level=1, cache=None, seed=None, sampler=None,
+                          precision="double", tolerance=1e-4, budget=None):
+    """
+    Runs a counting circuit in small batches until the estimate of M is settled.
+
+    After every batch the outcomes are grouped by decoded M and the run stops once
+    the leading M beats the runner-up at the requested one-sided confidence (and at
+    least min_shots were taken), or when max_shots is reached. The rule is checked
+    after every batch, so the per-look threshold is corrected for the number of
+    looks (sequential_threshold) and the confidence holds for the whole run.
+    The circuit is built and transpiled once through the circuit cache.
+
+    Args:
+        weights (list[int]): The set of numbers (e.g., [1,2,3])
+        target (int): Target subset sum
+        counting_qubits (int): t
+        backend: Simulator, defaults to the one plan_counting picks for 'budget'
+        batch_shots (int): Shots per batch
+        max_shots (int): Budget, the fixed shot count this replaces
+        confidence (float): One-sided confidence that the leading M is the most likely one,
+            over all the looks of the run
+        min_shots (int): Shots taken before the stopping rule is consulted
+        seed (int): Base simulator seed (batch i uses seed + i)
+        sampler (MarginalSampler): Draw the batches from a cached marginal instead of
+            re-simulating the circuit for every batch (noiseless runs only)
+        precision (str): "double" or "single" (complex64 statevector, half the memory) for the
+            default backend; single precision is only used once precision_guard has passed
+            with 'tolerance' on the calibration set
+        budget (int): Memory budget in bytes for the default backend (see plan_counting):
+            statevector, analytic sampling from the exact subspace state, MPS, or MemoryError
+
+    Returns:
+        dict: M, counts, shots, shots_saved (relative to max_shots), batches, margin, precision, method
+    """
+    n = len(weights)
+    analytic = None
+    if backend is None:
+        precision = checked_precision(precision, counting_qubits, tolerance)
+        plan = require_plan(plan_counting(weights, target, counting_qubits, mode, precision, budget))
+        if plan["method"] == "analytic":
+            analytic = SubspaceSimulator(count_solutions(weights, target), n)
+        else:
+            backend = planned_simulator(plan)
+
+    if analytic is None:
+        qc = cached_counting_circuit(weights, target, counting_qubits, mode=mode, backend=backend,
+                                     optimization_level=optimization_level, cache=cache, control=control)
+        # Hash the circuit once, not on every batch
+        key = None if sampler is None else circuit_fingerprint(qc)
+    # Looks: batch ends from the first one with min_shots taken up to max_shots
+    total_batches = -(-max_shots // batch_shots)
+    first_look = min(total_batches, max(1, -(-min_shots // batch_shots)))
+    threshold = sequential_threshold(confidence, total_batches - first_look + 1)
+
+    counts = Counter()
+    shots = 0
+    batches = 0
+    margin = 0.0
+    while shots < max_shots:
+        batch = min(batch_shots, max_shots - shots)
+        batch_seed = None if seed is None else seed + batches
+        if analytic is not None:
+            counts.update(analytic.counting_counts(counting_qubits, shots=batch, seed=batch_seed))
+        elif sampler is None:
+            counts.update(backend.run(qc, shots=batch, seed_simulator=batch_seed).result().get_counts())
+        else:
+            counts.update(sampler.sample_counts(qc, shots=batch, seed=batch_seed, key=key))
+        shots += batch
+        batches += 1
+
+        votes = decoded_counts(counts, n, counting_qubits)
+        margin = leading_margin(votes)
+        if shots >= min_shots and margin >= threshold:
+            break
+
+    votes = decoded_counts(counts, n, counting_qubits)
+    return {
+        "M": votes.most_common(1)[0][0],
+        "counts": dict(counts),
+        "shots": shots,
+        "shots_saved": max_shots - shots,
+        "batches": batches,
+        "margin": margin,
+        "precision": precision if analytic is not None else backend.options.precision,
+        "method": "analytic" if analytic is not None else backend.options.method,
+    }
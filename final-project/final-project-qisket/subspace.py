@@ -0,0 +1,125 @@
+import numpy as np
+from Final_Project.analytic import counting_metadata, counts_from_probabilities
+from Final_Project.enumeration import count_solutions
+
+
+def grover_matrix(M, n):
+    """
+    The Grover iteration G = D * O restricted to span{|good>, |bad>}.
+
+    |good> / |bad> are the uniform superpositions over the M marked and the
+    N - M unmarked bitstrings, and |s> = sin(a)|good> + cos(a)|bad> with
+    sin(a) = sqrt(M/N). O = diag(-1, 1) and D = I - 2|s><s| exactly as built
+    by diffusion_operator, so no sign convention is lost.
+    """
+    N = 2 ** n
+    s = np.array([np.sqrt(M / N), np.sqrt((N - M) / N)])
+    oracle = np.diag([-1.0, 1.0])
+    diffusion = np.eye(2) - 2 * np.outer(s, s)
+    return diffusion @ oracle
+
+
+class SubspaceSimulator:
+    """
+    Simulates Grover search and quantum counting in the 2-dimensional invariant subspace.
+
+    The oracle and the diffusion never leave span{|good>, |bad>}, so the search
+    register is two amplitudes instead of 2^n: a counting run is a 2^t x 2 array
+    and a Grover run is a 2-vector, whatever n is. Only M is needed, and it comes
+    from the circuit metadata written by the builders (marked_count, or weights
+    and target via count_solutions), so n=40 runs on a laptop.
+    """
+
+    def __init__(self, M, n):
+        self.M = M
+        self.n = n
+        self.N = 2 ** n
+        self.G = grover_matrix(M, n)
+        self.initial = np.array([np.sqrt(M / self.N), np.sqrt((self.N - M) / self.N)], dtype=complex)
+
+    @classmethod
+    def from_circuit(cls, circuit):
+        """
+        Builds the simulator for a circuit made by quantum_counting_circuit or grover_iteration.
+
+        Raises:
+            ValueError: if the circuit does not carry the builders' metadata, or uses an
+                approximate inverse QFT (only the exact transform is modelled)
+        """
+        metadata = counting_metadata(circuit)
+        oracle = metadata.get("oracle", {})
+        if "marked_count" in oracle:
+            M = oracle["marked_count"]
+        elif oracle.get("weights") is not None and oracle.get("target") is not None:
+            M = count_solutions(oracle["weights"], oracle["target"])
+        else:
+            raise ValueError("Oracle metadata does not determine the number of solutions")
+        return cls(M, metadata["n"])
+
+    # --- Grover search ---
+
+    def grover_state(self, iterations):
+        """(good, bad) amplitudes of G^iterations |s>."""
+        return np.linalg.matrix_power(self.G, iterations) @ self.initial
+
+    def grover_success_probability(self, iterations):
+        """Probability of measuring a marked bitstring after 'iterations' Grover iterations."""
+        return float(abs(self.grover_state(iterations)[0]) ** 2)
+
+    # --- Quantum counting ---
+
+    def counting_state(self, counting_qubits):
+        """
+        Reduced state of quantum_counting_circuit just before measurement.
+
+        Row m, column 0/1 is the amplitude of |m> (counting register, the measured
+        integer) times |good>/|bad>. The counting qubit i controls G^(2^i), so the
+        branch |k> carries G^k |s>; the inverse QFT then maps k -> m.
+        """
+        T = 2 ** counting_qubits
+        branches = np.empty((T, 2), dtype=complex)
+        branches[0] = self.initial
+        for k in range(1, T):
+            branches[k] = self.G @ branches[k - 1]
+
+        # Inverse QFT on the counting index: A[m] = 1/T * sum_k e^(-2*pi*i*k*m/T) G^k|s>
+        return np.fft.fft(branches, axis=0) / T
+
+    def counting_probabilities(self, counting_qubits):
+        """Probability of every measured integer m (marginal of counting_state)."""
+        probabilities = np.sum(np.abs(self.counting_state(counting_qubits)) ** 2, axis=1)
+        return probabilities / probabilities.sum()
+
+    def counting_counts(self, counting_qubits, shots=1024, seed=None):
+        """Aer-style counts (t-bit strings, MSB first) of a counting run."""
+        return counts_from_probabilities(self.counting_probabilities(counting_qubits), counting_qubits, shots, seed)
+
+    def expand_counting_statevector(self, counting_qubits, marked):
+        """
+        Full 2^(t+n) statevector in Qiskit's ordering (counting qubits lowest), for small n.
+
+        Compatible with Statevector(logical_counting_circuit(quantum_counting_circuit(...)))
+        for oracles without ancillas: |m>|x> gets A[m, good] / sqrt(M) for marked x and
+        A[m, bad] / sqrt(N - M) otherwise. The counting circuit itself leaves bit i on
+        counting_layout[i] (swap-free inverse QFT), so its raw Statevector is permuted.
+        """
+        reduced = self.counting_state(counting_qubits)
+        is_marked = np.zeros(self.N, dtype=bool)
+        is_marked[np.asarray(marked, dtype=np.int64)] = True
+
+        good = reduced[:, 0:1] / np.sqrt(self.M) if self.M else np.zeros((len(reduced), 1))
+        bad = reduced[:, 1:2] / np.sqrt(self.N - self.M) if self.M < self.N else np.zeros((len(reduced), 1))
+        full = np.where(is_marked[None, :], good, bad)
+
+        # Index = m + 2^t * x: x is the slow axis
+        return full.T.reshape(-1)
+
+    def run(self, circuit, shots=1024, seed=None):
+        """
+        Counts for a circuit from quantum_counting_circuit, in the format of Aer's get_counts().
+
+        Raises:
+            ValueError: for other circuits, and for an approximate inverse QFT
+        """
+        metadata = counting_metadata(circuit, kinds=("quantum_counting",))
+        return self.counting_counts(metadata["counting_qubits"], shots, seed)
@@ -0,0 +1,198 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from multiprocessing import get_context
+
+logger = logging.getLogger(__name__)
+
+# Columns of a sweep record, in CSV order
+RECORD_FIELDS = ["id", "weights", "target", "counting_qubits", "shots", "mode", "control",
+                 "measured", "M_estimate", "M_exact", "correct", "method", "seconds"]
+
+
+def instance_id(spec):
+    """Stable id of a sweep instance: sha256 of its canonical JSON (first 16 hex digits)."""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def sweep_grid(weights_list, targets=None, counting_qubits=(6,), shots=(1024,), mode="per_state",
+               control="kernel"):
+    """
+    Cartesian grid of sweep instances.
+
+    targets: per-weights list of targets (aligned with weights_list); defaults to 0..sum(weights)
+    """
+    instances = []
+    for k, weights in enumerate(weights_list):
+        weight_targets = range(sum(weights) + 1) if targets is None else targets[k]
+        for target, t, s in product(weight_targets, counting_qubits, shots):
+            instances.append({"weights": list(weights), "target": int(target), "counting_qubits": int(t),
+                              "shots": int(s), "mode": mode, "control": control})
+    return instances
+
+
+# Simulator options of this process (max_parallel_threads in workers), applied to planned backends
+_BACKEND_OPTIONS = {}
+
+
+def _init_worker(threads):
+    # Thread limits must be in place before the simulator's OpenMP runtime starts
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+
+    _BACKEND_OPTIONS["max_parallel_threads"] = threads
+
+
+def run_instance(spec, seed=None, budget=None):
+    """
+    Builds, transpiles (through the per-process circuit cache) and runs one counting instance.
+
+    The simulation method comes from plan_counting with 'budget' (bytes, defaults
+    to default_memory_budget()): instances too wide for a statevector are sampled
+    analytically from the exact subspace state, and the simulator itself is capped
+    at the budget, so the instance never allocates past it; a refused instance
+    (only possible when even that does not fit) is recorded with M_estimate None.
+
+    Returns:
+        dict: One record with the fields of RECORD_FIELDS
+    """
+    from Final_Project.cache import cached_counting_circuit
+    from Final_Project.counting import estimate_solutions
+    from Final_Project.enumeration import count_solutions
+    from Final_Project.planner import plan_counting, planned_simulator
+    from Final_Project.subspace import SubspaceSimulator
+
+    start = time.perf_counter()
+    n, t = len(spec["weights"]), spec["counting_qubits"]
+    M_exact = count_solutions(spec["weights"], spec["target"])
+    plan = plan_counting(spec["weights"], spec["target"], t, mode=spec["mode"], budget=budget)
+    record = dict(spec, id=instance_id(spec), M_exact=M_exact, method=plan["method"])
+
+    if plan["method"] == "refuse":
+        return dict(record, measured=None, M_estimate=None, correct=False, seconds=time.perf_counter() - start)
+    if plan["method"] == "analytic":
+        counts = SubspaceSimulator(M_exact, n).counting_counts(t, shots=spec["shots"], seed=seed)
+    else:
+        backend = planned_simulator(plan, **_BACKEND_OPTIONS)
+        qc = cached_counting_circuit(spec["weights"], spec["target"], t, mode=spec["mode"], backend=backend,
+                                     optimization_level=1, control=spec["control"])
+        counts = backend.run(qc, shots=spec["shots"], seed_simulator=seed).result().get_counts()
+
+    measured = int(max(counts, key=counts.get), 2)
+    M_estimate = estimate_solutions(measured, n, t)
+    return dict(record, measured=measured, M_estimate=M_estimate, correct=M_estimate == M_exact,
+                seconds=time.perf_counter() - start)
+
+
+def _complete_text(path):
+    # A crash mid-write leaves a partial last line behind: only whole lines count
+    with open(path, newline="") as f:
+        text = f.read()
+    return text[:text.rfind("\n") + 1]
+
+
+def completed_ids(path):
+    """Ids already present in a JSONL or CSV sink (empty if the file does not exist), ignoring a partial last line."""
+    if not os.path.exists(path):
+        return set()
+    text = _complete_text(path)
+    if path.endswith(".csv"):
+        return {row["id"] for row in csv.DictReader(io.StringIO(text))}
+    return {json.loads(line)["id"] for line in text.splitlines() if line.strip()}
+
+
+class RecordSink:
+    """Appends records to a .jsonl or .csv file, flushing after every record so a crash loses nothing."""
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.endswith(".csv")
+        if os.path.exists(path):
+            # Drop a partial last line so the next record does not continue it
+            complete = _complete_text(path)
+            if os.path.getsize(path) != len(complete.encode()):
+                with open(path, "w", newline="") as f:
+                    f.write(complete)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, record):
+        if self.csv:
+            row = {field: record[field] for field in RECORD_FIELDS}
+            row["weights"] = json.dumps(record["weights"])
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps({field: record[field] for field in RECORD_FIELDS}) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_sweep(instances, output, workers=None, threads_per_worker=1, seed=None, budget=None):
+    """
+    Runs counting instances on a process pool and streams the records to 'output'.
+
+    Each worker limits its simulator (and BLAS/OpenMP) to threads_per_worker
+    threads, so workers * threads_per_worker should not exceed the core count.
+    The memory budget is split evenly: every worker plans its instances against
+    budget // workers, so the pool as a whole stays within 'budget'.
+    Records are appended as instances complete (in completion order); instances
+    whose id is already in 'output' are skipped, so an interrupted sweep resumes
+    where it stopped. An instance that raises is logged and left out of 'output'
+    (the next run retries it) while the rest of the sweep carries on. The pool
+    uses 'spawn' workers: forking a parent that has already started OpenMP
+    threads is unsafe.
+
+    Args:
+        instances (list[dict]): Specs as built by sweep_grid
+        output (str): Path of a .jsonl or .csv sink
+        workers (int): Pool size, defaults to os.cpu_count() // threads_per_worker
+        threads_per_worker (int): Simulator threads per worker
+        seed (int): Simulator seed for every instance (reproducible sweeps)
+        budget (int): Memory budget in bytes for the whole pool, defaults to default_memory_budget()
+
+    Returns:
+        dict: Numbers of instances run, skipped and failed
+    """
+    from Final_Project.planner import default_memory_budget
+
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+    worker_budget = (default_memory_budget() if budget is None else budget) // workers
+
+    done = completed_ids(output)
+    pending = [spec for spec in instances if instance_id(spec) not in done]
+    skipped = len(instances) - len(pending)
+
+    with RecordSink(output) as sink, ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+        futures = {pool.submit(run_instance, spec, seed, worker_budget): spec for spec in pending}
+        failed = 0
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception:
+                failed += 1
+                logger.exception("Sweep instance %s failed: %s", instance_id(futures[future]), futures[future])
+                continue
+            sink.write(record)
+
+    return {"run": len(pending) - failed, "skipped": skipped, "failed": failed}
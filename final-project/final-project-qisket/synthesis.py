@@ -0,0 +1,270 @@
+import numpy as np
+from qiskit import transpile
+
+# Basis used when reporting gate counts / depth of the different oracle constructions
+REPORT_BASIS = ["u", "cx"]
+
+
+def phase_flip(qc, qubits):
+    """
+    Applies a (multi-)controlled Z over the given qubits: flips the phase of |11...1>.
+    """
+    qubits = list(qubits)
+    if len(qubits) == 1:
+        # Single literal: a plain Z gate flips the phase of |1>
+        qc.z(qubits[0])
+    else:
+        # Multi-controlled Z = H . MCX . H on the last qubit
+        qc.h(qubits[-1])
+        qc.mcx(qubits[:-1], qubits[-1])
+        qc.h(qubits[-1])
+
+
+# Largest register for which the pseudo-Kronecker expansion is searched exactly
+MAX_EXACT_ESOP_VARS = 16
+
+
+def _cover_cost(cubes):
+    # Fewer cubes first (one MCZ each), then fewer literals (smaller MCZs)
+    return (len(cubes), sum(bin(mask).count("1") for mask, _ in cubes))
+
+
+def _pseudo_kronecker(tt, k, memo):
+    """
+    Best pseudo-Kronecker ESOP of the k-variable truth table 'tt' (bit i = f(i)).
+
+    Each node expands on its top variable x with whichever of the three
+    expansions gives the cheaper cover:
+        Shannon:          f = x' f0  XOR  x f1
+        positive Davio:   f = f0     XOR  x (f0 XOR f1)
+        negative Davio:   f = f1     XOR  x' (f0 XOR f1)
+    """
+    if tt == 0:
+        return []
+    if tt == (1 << (1 << k)) - 1:
+        # Constant 1: a single cube with no literals
+        return [(0, 0)]
+
+    key = (k, tt)
+    if key in memo:
+        return memo[key]
+
+    half = 1 << (k - 1)
+    bit = 1 << (k - 1)
+    f0 = tt & ((1 << half) - 1)
+    f1 = tt >> half
+    g0 = _pseudo_kronecker(f0, k - 1, memo)
+    g1 = _pseudo_kronecker(f1, k - 1, memo)
+    g2 = _pseudo_kronecker(f0 ^ f1, k - 1, memo)
+
+    candidates = [
+        [(m | bit, v) for m, v in g0] + [(m | bit, v | bit) for m, v in g1],
+        g0 + [(m | bit, v | bit) for m, v in g2],
+        g1 + [(m | bit, v) for m, v in g2],
+    ]
+    best = min(candidates, key=_cover_cost)
+    memo[key] = best
+    return best
+
+
+def _reduce_cover(cover):
+    """
+    Applies the XOR reduction identities to a cube set until no rule applies:
+        C . x  XOR  C . x'  =  C        (distance-1 merge, same mask)
+        C      XOR  C . x   =  C . x'   (sub-cube absorption)
+        C      XOR  C       =  0        (cancellation)
+    """
+    cubes = set()
+
+    def toggle(cube):
+        # XOR semantics: adding a cube that is already present cancels it
+        if cube in cubes:
+            cubes.remove(cube)
+        else:
+            cubes.add(cube)
+
+    for cube in cover:
+        toggle(cube)
+
+    changed = True
+    while changed:
+        changed = False
+        # Fewest literals first, so the cheapest cubes absorb their neighbours
+        for cube in sorted(cubes, key=lambda c: (bin(c[0]).count("1"), c)):
+            if cube not in cubes:
+                continue
+            mask, value = cube
+            bits = mask
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+
+                partner = (mask, value ^ bit)
+                if partner in cubes:
+                    # Distance-1 merge: drop literal 'bit'
+                    cubes.remove(cube)
+                    cubes.remove(partner)
+                    toggle((mask ^ bit, value & ~bit))
+                    changed = True
+                    break
+
+                parent = (mask ^ bit, value & ~bit)
+                if parent in cubes:
+                    # Sub-cube absorption: C XOR C.x = C.x'
+                    cubes.remove(cube)
+                    cubes.remove(parent)
+                    toggle((mask, value ^ bit))
+                    changed = True
+                    break
+
+    return sorted(cubes)
+
+
+def esop_cover(indices, n, max_exact_vars=MAX_EXACT_ESOP_VARS):
+    """
+    Minimizes the marked-state set into an exclusive-sum-of-products (ESOP) cover.
+
+    A cube is a pair (mask, value): bit k of 'mask' says qubit k is a literal
+    (don't-care otherwise) and bit k of 'value' gives its polarity. The phase
+    (-1)^f(x) of the oracle equals the product of the phase flips of all cubes
+    containing x. Up to 'max_exact_vars' qubits the cover is the best
+    pseudo-Kronecker expansion of f; above that it starts from the minterms.
+    Either way it is then reduced with the XOR identities in _reduce_cover.
+
+    Args:
+        indices (Iterable[int]): Marked basis-state indices (little-endian)
+        n (int): Number of qubits
+        max_exact_vars (int): Largest n for the pseudo-Kronecker search
+
+    Returns:
+        list[tuple[int, int]]: The (mask, value) cubes, sorted
+    """
+    full_mask = (1 << n) - 1
+    minterms = [(full_mask, int(idx)) for idx in indices]
+    if n > max_exact_vars:
+        return _reduce_cover(minterms)
+
+    tt = 0
+    for idx in indices:
+        tt |= 1 << int(idx)
+    cover = _pseudo_kronecker(tt, n, {})
+    return min(_reduce_cover(cover), _reduce_cover(minterms), key=_cover_cost)
+
+
+def append_esop_oracle(qc, cubes):
+    """
+    Appends one phase flip per ESOP cube, controlled only on the cube's literals.
+    """
+    for mask, value in cubes:
+        literals = [k for k in range(qc.num_qubits) if (mask >> k) & 1]
+        if not literals:
+            # The constant-1 cube flips every state: a global phase of -1
+            qc.global_phase += np.pi
+            continue
+
+        # Negative literals are mapped to |1> with X gates around the flip
+        negated = [k for k in literals if not (value >> k) & 1]
+        if negated:
+            qc.x(negated)
+        phase_flip(qc, literals)
+        if negated:
+            qc.x(negated)
+
+
+# Above this many marked states the tour falls back to pure Gray-code rank order
+MAX_GREEDY_TOUR_STATES = 2048
+
+
+def gray_rank(indices):
+    """Position of each index in the binary-reflected Gray code sequence (inverse Gray code)."""
+    rank = np.array(indices, dtype=np.int64)
+    shift = rank >> 1
+    while shift.any():
+        rank ^= shift
+        shift >>= 1
+    return rank
+
+
+def gray_tour(indices, n):
+    """
+    Orders the marked states so that consecutive states differ in as few bits as possible.
+
+    States are first sorted by Gray-code rank (neighbours in that order differ in
+    one bit whenever both are marked). For small sets a greedy nearest-neighbour
+    walk by Hamming distance then starts from the state with the fewest zeros,
+    since every zero costs an X gate before the first flip.
+
+    Returns:
+        list[int]: The marked indices in tour order
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size == 0:
+        return []
+
+    ordered = indices[np.argsort(gray_rank(indices), kind="stable")]
+    if ordered.size > MAX_GREEDY_TOUR_STATES:
+        return ordered.tolist()
+
+    # Hamming distance between all pairs: popcount of the XOR, one bit-plane at a time
+    xor = ordered[:, None] ^ ordered[None, :]
+    distance = np.zeros(xor.shape, dtype=np.int64)
+    for k in range(n):
+        distance += (xor >> k) & 1
+
+    ones = np.zeros(ordered.size, dtype=np.int64)
+    for k in range(n):
+        ones += (ordered >> k) & 1
+
+    current = int(np.argmax(ones))
+    visited = np.zeros(ordered.size, dtype=bool)
+    tour = []
+    for _ in range(ordered.size):
+        visited[current] = True
+        tour.append(int(ordered[current]))
+        remaining = np.where(visited, n + 1, distance[current])
+        current = int(np.argmin(remaining))
+    return tour
+
+
+def append_gray_oracle(qc, tour):
+    """
+    Appends one full MCZ per marked state, toggling only the bits that differ between
+    successive states instead of undoing and re-applying each state's X mask.
+    """
+    n = qc.num_qubits
+    full_mask = (1 << n) - 1
+    x_mask = 0  # qubits currently wrapped in an X gate
+    for idx in tour:
+        # Zeros of the state must be flipped to |1> before the MCZ
+        needed = full_mask & ~idx
+        toggles = [k for k in range(n) if ((x_mask ^ needed) >> k) & 1]
+        if toggles:
+            qc.x(toggles)
+        x_mask = needed
+        phase_flip(qc, range(n))
+
+    # Restore the original basis once at the very end
+    toggles = [k for k in range(n) if (x_mask >> k) & 1]
+    if toggles:
+        qc.x(toggles)
+
+
+def synthesis_report(weights, target, modes=("per_state", "esop")):
+    """
+    Compares the oracle constructions for one instance after transpiling to REPORT_BASIS.
+
+    Returns:
+        dict: mode -> {"size": total gates, "cx": CX count, "depth": circuit depth}
+    """
+    from Final_Project.oracle import subset_sum_oracle
+
+    report = {}
+    for mode in modes:
+        oracle = subset_sum_oracle(weights, target, mode=mode)
+        t_oracle = transpile(oracle, basis_gates=REPORT_BASIS, optimization_level=0)
+        report[mode] = {
+            "size": t_oracle.size(),
+            "cx": t_oracle.count_ops().get("cx", 0),
+            "depth": t_oracle.depth(),
+        }
+    return report
@@ -0,0 +1,50 @@
+from qiskit import transpile
+from Final_Project.oracle import subset_sum_adder_oracle_template, target_flip_values, sum_register_size
+from Final_Project.counting import quantum_counting_circuit
+from Final_Project.cache import DEFAULT_CACHE, instance_key
+
+
+class CountingTemplate:
+    """
+    Quantum counting circuit for one weights vector, compiled once for every target.
+
+    The adder oracle's structure does not depend on the target; only the
+    comparator's X layer does, and the template carries it as RX angles
+    (see subset_sum_adder_oracle_template). The counting circuit is built and
+    transpiled once (through the circuit cache), and each target only binds
+    those angles, so a target sweep costs one transpilation plus simulation.
+    'control' is passed to quantum_counting_circuit ("kernel" also fits the
+    template: the RX pair is a basis change around the comparator's phase flip).
+    """
+
+    def __init__(self, weights, counting_qubits=4, backend=None, optimization_level=None, cache=None,
+                 control="full"):
+        self.weights = list(weights)
+        self.n = len(weights)
+        self.counting_qubits = counting_qubits
+        self.sum_bits = sum_register_size(weights, 0)
+        self.max_target = sum(weights)
+
+        cache = DEFAULT_CACHE if cache is None else cache
+        # Only the counting register is measured, so the sorted weights give the same outcomes
+        key = instance_key("counting_template", weights, None, "adder", t=counting_qubits, control=control)
+
+        def build():
+            oracle, _ = subset_sum_adder_oracle_template(sorted(self.weights))
+            return quantum_counting_circuit(self.n, oracle, counting_qubits=counting_qubits, control=control)
+
+        self.circuit = cache.get_or_build(key, build)
+        if backend is not None:
+            t_key = key + (("backend", backend.name), ("optimization_level", optimization_level))
+            self.circuit = cache.get_or_build(
+                t_key, lambda: transpile(self.circuit, backend, optimization_level=optimization_level))
+
+        # Parameters survive transpilation and QPY round trips by name
+        self._theta = sorted(self.circuit.parameters, key=lambda p: p.index)
+
+    def bind(self, target):
+        """Returns the (transpiled) counting circuit for 'target' with only the comparator angles bound."""
+        if not 0 <= target <= self.max_target:
+            raise ValueError(f"Target {target} is outside the achievable range 0..{self.max_target}")
+        values = target_flip_values(target, self.sum_bits)
+        return self.circuit.assign_parameters(dict(zip(self._theta, values)), inplace=False)
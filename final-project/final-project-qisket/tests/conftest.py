@@ -0,0 +1,28 @@
+import pytest
+from Final_Project.counting import estimate_solutions
+from Final_Project.tests.test_counting import FINAL_TEST_SUITE
+
+
+class Scenario:
+    """One FINAL_TEST_SUITE row plus the system-accuracy assertion every engine shares."""
+
+    def __init__(self, weights, target, expected_M, label):
+        self.weights = weights
+        self.target = target
+        self.expected_M = expected_M
+        self.label = label
+        self.n = len(weights)
+
+    def check_M(self, actual_M):
+        assert actual_M == self.expected_M, f"Failed {self.label}: Expected {self.expected_M}, got {actual_M}"
+
+    def check_counts(self, counts, counting_qubits):
+        """The test_system_accuracy post-processing: the most frequent outcome must decode to M."""
+        measured_int = int(max(counts, key=counts.get), 2)
+        self.check_M(estimate_solutions(measured_int, self.n, counting_qubits))
+
+
+@pytest.fixture(params=FINAL_TEST_SUITE, ids=[label for *_, label in FINAL_TEST_SUITE])
+def scenario(request):
+    """Runs the test once per FINAL_TEST_SUITE scenario."""
+    return Scenario(*request.param)
@@ -0,0 +1,67 @@
+import numpy as np
+from qiskit.quantum_info import Statevector
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.counting import quantum_counting_circuit, estimate_solutions
+from Final_Project.analytic import (counting_distribution, sample_counts, analytic_counts, approximate_iqft_report,
+                                   counts_from_probabilities)
+from Final_Project.enumeration import SubsetSumIndex
+
+
+def test_distribution_matches_statevector(scenario):
+    """The closed form must reproduce the simulated counting-register marginal exactly."""
+    n, t = scenario.n, 4
+    qc = quantum_counting_circuit(n, subset_sum_oracle(scenario.weights, scenario.target), counting_qubits=t,
+                                  control="kernel")
+    qc.remove_final_measurements()
+    # Bit i of the measured integer is on counting_layout[i] (swap-free inverse QFT)
+    simulated = Statevector(qc).probabilities(qc.metadata["counting_layout"])
+
+    assert np.allclose(counting_distribution(scenario.expected_M, n, t), simulated, atol=1e-9), f"Failed {scenario.label}"
+
+
+def test_analytic_system_accuracy(scenario):
+    """Same post-processing as test_system_accuracy, on sampled analytic counts."""
+    t = 6
+    counts = analytic_counts(scenario.weights, scenario.target, counting_qubits=t, shots=1024, seed=1)
+    assert sum(counts.values()) == 1024 and all(len(key) == t for key in counts)
+    scenario.check_counts(counts, t)
+
+
+def test_large_sweep_runs_without_simulation():
+    """A full target sweep at n=20, t=10 only needs one enumeration pass plus O(2^t) per target."""
+    weights = [3, 5, 7, 11, 13, 2, 4, 6, 8, 10, 1, 9, 12, 14, 15, 16, 17, 18, 19, 20]
+    n, t = len(weights), 10
+    index = SubsetSumIndex(weights)
+
+    for target in range(0, sum(weights) + 1, 7):
+        M = index.count(target)
+        probabilities = counting_distribution(M, n, t)
+        assert np.isclose(probabilities.sum(), 1.0)
+
+        # The most likely outcome is within the t-bit resolution of the true M
+        counts = sample_counts(M, n, t, shots=256, seed=target)
+        estimate = estimate_solutions(int(max(counts, key=counts.get), 2), n, t)
+        resolution = 2 * np.pi * np.sqrt(M * (2 ** n - M)) / 2 ** t + np.pi ** 2 * 2 ** n / 4 ** t
+        assert abs(estimate - min(M, 2 ** n - M)) <= resolution + 1
+
+
+def test_approximate_iqft_report():
+    """Degree 0 is the exact QFT; every extra degree removes rotations and never gets closer to it."""
+    rows = approximate_iqft_report(22, 10, counting_range=[6, 8])
+    for t in (6, 8):
+        table = [row for row in rows if row["t"] == t]
+        assert [row["degree"] for row in table] == list(range(t))
+        assert table[0]["rotations"] == t * (t - 1) // 2 and table[0]["tv_distance"] < 1e-9
+        assert table[-1]["rotations"] == 0
+
+        rotations = [row["rotations"] for row in table]
+        distances = [row["tv_distance"] for row in table]
+        assert rotations == sorted(rotations, reverse=True)
+        assert distances == sorted(distances)
+
+
+def test_counts_from_probabilities_format():
+    """Zero-padded MSB-first bitstrings, only drawn outcomes, shots preserved."""
+    counts = counts_from_probabilities([0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0], 3, shots=10, seed=1)
+    assert counts == {"101": 10}
+    assert counts_from_probabilities([0.5, 0.5], 4, shots=100, seed=1).keys() <= {"0000", "0001"}
@@ -0,0 +1,166 @@
+import os
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from qiskit.quantum_info import Operator
+from qiskit_aer import AerSimulator
+from Final_Project.cache import (CircuitCache, instance_key, cached_oracle, cached_diffusion,
+                                 cached_grover_iteration, cached_counting_circuit, circuit_fingerprint,
+                                 stitched_counting_circuit)
+from Final_Project.oracle import subset_sum_oracle, oracle_diagonal
+from Final_Project.grover import grover_iteration
+from Final_Project.counting import estimate_solutions, quantum_counting_circuit, controlled_grover_base
+from Final_Project.runner import MarginalSampler
+from Final_Project.vector_engine import VectorGroverEngine
+from qiskit.quantum_info import Statevector
+
+
+def test_lru_eviction_in_memory():
+    """Only the most recently used 'max_entries' circuits stay in memory."""
+    cache = CircuitCache(max_entries=2)
+    for n in (1, 2, 3):
+        cache.put(("c", n), QuantumCircuit(n))
+
+    cache.get(("c", 2))  # 1 was already evicted; refreshing 2 makes 3 the oldest
+    cache.put(("c", 4), QuantumCircuit(4))
+
+    assert cache.get(("c", 1)) is None
+    assert cache.get(("c", 3)) is None
+    assert cache.get(("c", 2)) is not None
+    assert cache.get(("c", 4)) is not None
+
+
+def test_disk_store_survives_new_cache(tmp_path):
+    """A second cache on the same directory loads the QPY file instead of rebuilding."""
+    first = CircuitCache(directory=str(tmp_path))
+    cached_oracle([1, 2, 3], 3, cache=first)
+
+    second = CircuitCache(directory=str(tmp_path))
+    oracle = cached_oracle([1, 2, 3], 3, cache=second)
+    assert second.disk_hits == 1 and second.misses == 0
+    assert Operator(oracle).equiv(Operator(subset_sum_oracle([1, 2, 3], 3)))
+
+
+def test_disk_store_size_eviction(tmp_path):
+    """The directory never grows past max_disk_bytes; the oldest files go first."""
+    cache = CircuitCache(directory=str(tmp_path), max_disk_bytes=2000)
+    for target in range(8):
+        cached_oracle([1, 2, 3, 4], target, cache=cache)
+
+    total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert 0 < total <= 2000
+
+
+def test_permuted_weights_share_entry():
+    """[3,1,2] reuses the circuit built for [1,2,3], relabelled to its own qubit order."""
+    cache = CircuitCache()
+    cached_oracle([1, 2, 3], 3, cache=cache)
+    oracle = cached_oracle([3, 1, 2], 3, cache=cache)
+
+    assert cache.hits == 1
+    assert instance_key("oracle", [3, 1, 2], 3, "per_state") == instance_key("oracle", [1, 2, 3], 3, "per_state")
+    assert np.allclose(Operator(oracle).data, Operator(subset_sum_oracle([3, 1, 2], 3)).data)
+
+    grover = cached_grover_iteration([3, 1, 2], 3, cache=cache)
+    expected = grover_iteration(subset_sum_oracle([3, 1, 2], 3))
+    assert np.allclose(Operator(grover).data, Operator(expected).data)
+
+
+def test_permuted_weights_metadata():
+    """The relabelled circuits name the caller's weight order, so metadata-driven engines match them."""
+    cache = CircuitCache()
+    cached_oracle([1, 2, 3, 5], 5, cache=cache)
+    oracle = cached_oracle([3, 1, 5, 2], 5, cache=cache)
+    grover = cached_grover_iteration([3, 1, 5, 2], 5, cache=cache)
+    assert oracle.metadata["weights"] == [3, 1, 5, 2]
+    assert grover.metadata["oracle"]["weights"] == [3, 1, 5, 2]
+
+    engine = VectorGroverEngine.from_circuit(grover)
+    engine.apply_grover(1)
+    state = QuantumCircuit(4)
+    state.h(range(4))
+    state.compose(grover, inplace=True)
+    assert np.allclose(engine.state, Statevector(state).data)
+
+
+def test_permuted_diagonal_oracle():
+    """A relabelled diagonal oracle reports its phases in its own qubit order, so c-G matches the direct build."""
+    weights, target = [3, 1, 2, 5], 4
+    cache = CircuitCache()
+    oracle = cached_oracle(weights, target, mode="diagonal", cache=cache)
+    direct = subset_sum_oracle(weights, target, mode="diagonal")
+    assert np.allclose(oracle_diagonal(oracle), np.diag(Operator(oracle).data))
+    assert np.allclose(oracle_diagonal(oracle), oracle_diagonal(direct))
+    for control in ("full", "kernel"):
+        assert np.allclose(Operator(controlled_grover_base(oracle, len(weights), control)).data,
+                           Operator(controlled_grover_base(direct, len(weights), control)).data)
+
+
+def test_diffusion_is_cached_per_n():
+    cache = CircuitCache()
+    assert cached_diffusion(3, cache=cache) is cached_diffusion(3, cache=cache)
+    assert cache.hits == 1
+
+
+def test_repeated_sweep_skips_construction_and_transpilation():
+    """Second pass over the same sweep: every counting circuit is a cache hit, results unchanged."""
+    cache = CircuitCache()
+    backend = AerSimulator()
+    sweep = [([1, 2, 3], 3, 2), ([2, 1, 3], 3, 2), ([1, 1, 1, 1], 2, 6)]
+
+    misses_per_pass = []
+    for _ in range(2):
+        for weights, target, expected_M in sweep:
+            t_qc = cached_counting_circuit(weights, target, counting_qubits=6, backend=backend, cache=cache)
+            counts = backend.run(t_qc, shots=1024, seed_simulator=11).result().get_counts()
+            measured_int = int(max(counts, key=counts.get), 2)
+            assert estimate_solutions(measured_int, len(weights), 6) == expected_M
+        misses_per_pass.append(cache.misses)
+
+    # Pass 1 builds [1,2,3] and [1,1,1,1] (counting circuit, oracle, transpiled circuit);
+    # [2,1,3] is a permutation of [1,2,3]. Pass 2 builds and transpiles nothing.
+    assert misses_per_pass == [6, 6]
+
+
+def test_circuit_fingerprint_is_structural():
+    """Rebuilding a circuit gives the same fingerprint; another target or t does not."""
+    build = lambda target, t: quantum_counting_circuit(3, subset_sum_oracle([1, 2, 3], target), counting_qubits=t)
+    assert circuit_fingerprint(build(3, 4)) == circuit_fingerprint(build(3, 4))
+    assert circuit_fingerprint(build(3, 4)) != circuit_fingerprint(build(4, 4))
+    assert circuit_fingerprint(build(3, 4)) != circuit_fingerprint(build(3, 3))
+
+
+def test_stitched_counting_matches_full_transpile(scenario):
+    """Blocks transpiled separately and stitched give the same outcome distribution."""
+    backend = AerSimulator()
+    sampler = MarginalSampler(backend)
+    for control in ("full", "kernel"):
+        oracle = subset_sum_oracle(scenario.weights, scenario.target)
+        stitched = stitched_counting_circuit(scenario.n, oracle, backend, counting_qubits=4, control=control,
+                                             optimization_level=1, cache=CircuitCache())
+        full = transpile(quantum_counting_circuit(scenario.n, oracle, counting_qubits=4, control=control),
+                         backend, optimization_level=1)
+        assert np.allclose(sampler.marginal(stitched), sampler.marginal(full)), f"Failed {scenario.label} ({control})"
+
+
+def test_transpile_cache_reuses_blocks():
+    """A second target with the same n and t only transpiles its controlled oracle."""
+    backend = AerSimulator()
+    cache = CircuitCache()
+    stitched_counting_circuit(3, subset_sum_oracle([1, 2, 3], 3), backend, counting_qubits=4, cache=cache)
+    assert cache.stats() == {"hits": 0, "disk_hits": 0, "misses": 3}
+
+    qc = stitched_counting_circuit(3, subset_sum_oracle([1, 2, 3], 4), backend, counting_qubits=4, cache=cache)
+    # c-D and the inverse QFT hit, c-O misses
+    assert cache.stats() == {"hits": 2, "disk_hits": 0, "misses": 4}
+
+    counts = backend.run(qc, shots=1024).result().get_counts()
+    assert estimate_solutions(int(max(counts, key=counts.get), 2), 3, 4) == 1
+
+
+def test_cached_counting_circuit_stitch():
+    """stitch=True goes through the block cache and runs like the whole-circuit transpile."""
+    backend = AerSimulator()
+    qc = cached_counting_circuit([1, 1, 1, 1], 2, counting_qubits=6, backend=backend, stitch=True,
+                                 cache=CircuitCache())
+    counts = backend.run(qc, shots=1024).result().get_counts()
+    assert estimate_solutions(int(max(counts, key=counts.get), 2), 4, 6) == 6
@@ -1,8 +1,13 @@
 from qiskit_aer import AerSimulator
-from qiskit import transpile
-from Final_Project.oracle import subset_sum_oracle
-from Final_Project.counting import quantum_counting_circuit, estimate_solutions
+from qiskit import transpile, QuantumCircuit
+from Final_Project.oracle import subset_sum_oracle, subset_sum_adder_oracle
+from Final_Project.analytic import counting_distribution
+from Final_Project.counting import quantum_counting_circuit, estimate_solutions, controlled_grover, controlled_grover_base, \
+    iterative_counting_circuit, inverse_qft, logarithmic_approximation_degree, logical_counting_circuit, \
+    required_counting_qubits
 import pytest
+import numpy as np
+from qiskit.quantum_info import Operator, Statevector
 
 
 # These represent four distinct "scenarios" to prove our algorithm works.
@@ -47,4 +52,271 @@ def test_system_accuracy(weights, target, expected_M, label):
     
     # Assert with a small tolerance (Quantum Counting is an estimate)
     # For these small N, it should be exactly correct when rounded.
-    assert actual_M == expected_M, f"Failed {label}: Expected {expected_M}, got {actual_M} (Measured: {measured_str})"
\ No newline at end of file
+    assert actual_M == expected_M, f"Failed {label}: Expected {expected_M}, got {actual_M} (Measured: {measured_str})"
+
+
+# Adder oracles carry a sum register, so the controlled G^(2^i) blocks act on n + s qubits.
+# (weights, target, expected_M, label)
+ADDER_TEST_SUITE = FINAL_TEST_SUITE + [
+    ([1, 1], 2, 1, "Duplicate Weights M=1"),
+]
+
+@pytest.mark.parametrize("weights, target, expected_M, label", ADDER_TEST_SUITE)
+
+def test_adder_oracle_counting(weights, target, expected_M, label):
+    """
+    The arithmetic oracle plugs into quantum_counting_circuit in place of the
+    enumerated oracle; its ancillas are left in |0> and only the count is measured.
+    """
+    n = len(weights)
+    t = 6
+
+    oracle = subset_sum_adder_oracle(weights, target)
+    qc = quantum_counting_circuit(n, oracle, counting_qubits=t)
+    assert qc.num_qubits == t + oracle.num_qubits
+
+    backend = AerSimulator()
+    counts = backend.run(transpile(qc, backend), shots=1024).result().get_counts()
+    measured_int = int(max(counts, key=counts.get), 2)
+
+    actual_M = estimate_solutions(measured_int, n, t)
+    assert actual_M == expected_M, f"Failed {label}: Expected {expected_M}, got {actual_M}"
+
+
+# Simulation-only fast path: the oracle is one DiagonalGate, so larger registers stay cheap.
+DIAGONAL_TEST_SUITE = FINAL_TEST_SUITE + [
+    # M=22 of N=1024 sits on the t=6 grid: 1024 * sin^2(3*pi/64) = 22.05
+    ([1, 2, 3, 6, 9, 10, 11, 15, 18, 19], 47, 22, "Diagonal n=10"),
+]
+
+@pytest.mark.parametrize("weights, target, expected_M, label", DIAGONAL_TEST_SUITE)
+
+def test_diagonal_oracle_counting(weights, target, expected_M, label):
+    """
+    The diagonal oracle must count exactly like the gate-based one while every
+    oracle application stays a native instruction for Aer after transpiling.
+    """
+    n = len(weights)
+    t = 6
+
+    oracle = subset_sum_oracle(weights, target, mode="diagonal")
+    qc = quantum_counting_circuit(n, oracle, counting_qubits=t)
+
+    backend = AerSimulator()
+    t_qc = transpile(qc, backend)
+    # No dense unitaries and no MCZ decompositions reach the simulator
+    assert "unitary" not in t_qc.count_ops()
+    assert "mcx" not in t_qc.count_ops()
+
+    counts = backend.run(t_qc, shots=1024).result().get_counts()
+    measured_int = int(max(counts, key=counts.get), 2)
+
+    actual_M = estimate_solutions(measured_int, n, t)
+    assert actual_M == expected_M, f"Failed {label}: Expected {expected_M}, got {actual_M}"
+
+
+def test_controlled_grover_shares_one_definition():
+    """
+    c-G^(2^i) must repeat a single shared c-G instead of a dense matrix power:
+    the circuit for n=14 builds instantly and holds no 'unitary' instruction.
+    """
+    weights = list(range(1, 15))
+    oracle = subset_sum_adder_oracle(weights, 20)
+    base = controlled_grover_base(oracle, len(weights))
+
+    gate = controlled_grover(oracle, 8, len(weights), base=base)
+    operations = [instruction.operation for instruction in gate.definition.data]
+    assert len(operations) == 8
+    assert all(op is base for op in operations)
+
+    qc = quantum_counting_circuit(len(weights), oracle, counting_qubits=3)
+    assert "unitary" not in qc.decompose(reps=3).count_ops()
+
+
+# Every oracle construction paired with its label, for the kernel-control checks
+KERNEL_ORACLES = [
+    (lambda w, t: subset_sum_oracle(w, t), "per_state"),
+    (lambda w, t: subset_sum_oracle(w, t, mode="esop"), "esop"),
+    (lambda w, t: subset_sum_oracle(w, t, mode="gray"), "gray"),
+    (subset_sum_adder_oracle, "adder"),
+]
+
+@pytest.mark.parametrize("weights, target, expected_M, label", FINAL_TEST_SUITE)
+@pytest.mark.parametrize("build_oracle, oracle_label", KERNEL_ORACLES)
+
+def test_kernel_control_equivalence(weights, target, expected_M, label, build_oracle, oracle_label):
+    """Controlling only the phase kernels must give exactly the same c-G unitary as controlling all of G."""
+    n = len(weights)
+    oracle = build_oracle(weights, target)
+    full = Operator(controlled_grover_base(oracle, n, control="full"))
+    kernel = Operator(controlled_grover_base(oracle, n, control="kernel"))
+    assert np.allclose(kernel.data, full.data), f"Failed {label} ({oracle_label})"
+
+
+def test_kernel_control_counting(scenario):
+    """
+    Kernel-controlled counting must find the same M with fewer gates and less depth.
+    """
+    n = scenario.n
+    t = 6
+    backend = AerSimulator()
+    oracle = subset_sum_oracle(scenario.weights, scenario.target)
+
+    full = transpile(quantum_counting_circuit(n, oracle, counting_qubits=t), backend, optimization_level=1)
+    kernel = transpile(quantum_counting_circuit(n, oracle, counting_qubits=t, control="kernel"),
+                       backend, optimization_level=1)
+    assert kernel.size() <= full.size(), f"Failed {scenario.label}: {kernel.size()} > {full.size()}"
+    assert kernel.depth() <= full.depth(), f"Failed {scenario.label}: {kernel.depth()} > {full.depth()}"
+
+    scenario.check_counts(backend.run(kernel, shots=1024).result().get_counts(), t)
+
+
+def test_iterative_counting_accuracy(scenario):
+    """
+    Single-ancilla phase estimation reads the same measured_value as the QFT circuit
+    while simulating 1 + n qubits instead of t + n.
+    """
+    n = scenario.n
+    t = 6
+    oracle = subset_sum_oracle(scenario.weights, scenario.target)
+    qc = iterative_counting_circuit(n, oracle, counting_qubits=t, control="kernel")
+    assert qc.num_qubits == 1 + n and qc.num_clbits == t
+
+    backend = AerSimulator()
+    counts = backend.run(transpile(qc, backend, optimization_level=1), shots=1024).result().get_counts()
+    scenario.check_counts(counts, t)
+
+
+def test_iterative_counting_distribution():
+    """The semi-classical inverse QFT has the same outcome distribution as the full one."""
+    weights, target, t, shots = [1, 2, 3, 4, 5], 7, 5, 20000
+    qc = iterative_counting_circuit(len(weights), subset_sum_oracle(weights, target), counting_qubits=t,
+                                    control="kernel")
+    backend = AerSimulator()
+    counts = backend.run(transpile(qc, backend, optimization_level=1), shots=shots,
+                         seed_simulator=1).result().get_counts()
+
+    empirical = np.zeros(2 ** t)
+    for bitstring, count in counts.items():
+        empirical[int(bitstring, 2)] = count / shots
+    # Total variation distance within sampling noise
+    assert 0.5 * np.abs(empirical - counting_distribution(3, len(weights), t)).sum() < 0.03
+
+
+def test_approximate_iqft_counting(scenario):
+    """Dropping the smallest rotations (logarithmic cutoff) must not change the estimate."""
+    t = 6
+    oracle = subset_sum_oracle(scenario.weights, scenario.target)
+    qc = quantum_counting_circuit(scenario.n, oracle, counting_qubits=t, control="kernel",
+                                  approximation_degree=logarithmic_approximation_degree(t))
+
+    backend = AerSimulator()
+    counts = backend.run(transpile(qc, backend, optimization_level=1), shots=1024).result().get_counts()
+    scenario.check_counts(counts, t)
+
+
+def test_approximate_iqft_rotation_count():
+    """The logarithmic cutoff keeps O(t log t) rotations instead of t(t-1)/2."""
+    for t in range(2, 17):
+        qc = QuantumCircuit(t)
+        inverse_qft(qc, list(range(t)), approximation_degree=logarithmic_approximation_degree(t))
+        kept = max(1, int(np.ceil(np.log2(t))))
+        assert qc.count_ops().get("cp", 0) <= t * kept
+        assert qc.count_ops().get("cp", 0) <= t * (t - 1) // 2
+
+
+@pytest.mark.parametrize("t", [2, 3, 4, 5, 6])
+
+def test_swap_free_iqft_matches_swapped(t):
+    """Reading bit i from the returned order gives exactly the swapped inverse QFT, with no swaps."""
+    rng = np.random.default_rng(t)
+    state = rng.normal(size=2 ** t) + 1j * rng.normal(size=2 ** t)
+    state /= np.linalg.norm(state)
+
+    swapped = QuantumCircuit(t)
+    inverse_qft(swapped, list(range(t)))
+    virtual = QuantumCircuit(t)
+    order = inverse_qft(virtual, list(range(t)), do_swaps=False)
+
+    assert "swap" not in virtual.count_ops()
+    expected = Statevector(state).evolve(swapped).probabilities()
+    assert np.allclose(Statevector(state).evolve(virtual).probabilities(order), expected)
+
+
+def test_swap_free_counting_circuit():
+    """Counting circuits carry no swaps, fewer 2-qubit gates, and the same logical state as before."""
+    weights, target, t = [1, 2, 3], 3, 5
+    oracle = subset_sum_oracle(weights, target)
+    qc = quantum_counting_circuit(len(weights), oracle, counting_qubits=t, control="kernel")
+    assert qc.metadata["counting_layout"] == list(reversed(range(t)))
+    assert "swap" not in qc.count_ops()
+
+    # The old construction: everything before the inverse QFT, then the swapped inverse QFT
+    swapped_iqft = QuantumCircuit(t)
+    inverse_qft(swapped_iqft, list(range(t)))
+    reference = qc.remove_final_measurements(inplace=False)
+    reference.data = reference.data[:len(reference.data) - t * (t + 1) // 2]
+    reference.compose(swapped_iqft, qubits=range(t), inplace=True)
+    assert np.allclose(Statevector(logical_counting_circuit(qc)).data, Statevector(reference).data)
+
+    swap_free_iqft = QuantumCircuit(t)
+    inverse_qft(swap_free_iqft, list(range(t)), do_swaps=False)
+    cx = [transpile(c, basis_gates=["u", "cx"], optimization_level=0).count_ops().get("cx", 0)
+          for c in (swapped_iqft, swap_free_iqft)]
+    assert cx[1] == cx[0] - 3 * (t // 2)
+
+
+@pytest.mark.parametrize("n", [3, 4, 6])
+@pytest.mark.parametrize("absolute_error, success_probability", [(0.49, None), (0.49, 0.95), (2, 0.99)])
+
+def test_required_counting_qubits_meets_bound(n, absolute_error, success_probability):
+    """For every M, the chosen t (sufficient, not minimal) lands within the error with the requested probability."""
+    t = required_counting_qubits(n, absolute_error=absolute_error, success_probability=success_probability)
+    estimates = np.array([estimate_solutions(m, n, t) for m in range(2 ** t)])
+    required = 8 / np.pi ** 2 if success_probability is None else success_probability
+
+    for M in range(2 ** n + 1):
+        # estimate_solutions folds M > N/2 back to N - M
+        within = np.abs(estimates - min(M, 2 ** n - M)) <= absolute_error
+        assert counting_distribution(M, n, t)[within].sum() >= required, f"Failed M={M}, t={t}"
+
+    # One qubit fewer no longer satisfies the worst-case bound
+    if success_probability is None:
+        T = 2 ** (t - 1)
+        assert np.pi * 2 ** n / T + np.pi ** 2 * 2 ** n / T ** 2 > absolute_error
+
+
+def test_counting_circuit_derives_precision():
+    """An error target replaces counting_qubits; the default stays 4."""
+    oracle = subset_sum_oracle([1, 2, 3], 3)
+    assert quantum_counting_circuit(3, oracle).metadata["counting_qubits"] == 4
+
+    qc = quantum_counting_circuit(3, oracle, absolute_error=0.49, control="kernel")
+    assert qc.metadata["counting_qubits"] == required_counting_qubits(3, absolute_error=0.49) == qc.num_clbits
+
+    # Relative bounds get looser as M grows, so fewer qubits suffice for larger min_solutions
+    assert required_counting_qubits(10, relative_error=0.1, min_solutions=16) < \
+        required_counting_qubits(10, relative_error=0.1, min_solutions=1)
+    with pytest.raises(ValueError):
+        required_counting_qubits(3)
+    with pytest.raises(ValueError):
+        quantum_counting_circuit(3, oracle, counting_qubits=6, absolute_error=0.49)
+    with pytest.raises(ValueError):
+        quantum_counting_circuit(3, oracle, success_probability=0.99)
+
+    # min_solutions reaches the relative bound
+    qc = quantum_counting_circuit(10, subset_sum_oracle([1] * 10, 5), relative_error=0.1, min_solutions=16,
+                                  control="kernel")
+    assert qc.metadata["counting_qubits"] == required_counting_qubits(10, relative_error=0.1, min_solutions=16)
+
+
+@pytest.mark.parametrize("arguments", [
+    {"absolute_error": 0}, {"absolute_error": -1}, {"relative_error": 0}, {"relative_error": -0.1},
+    {"relative_error": 0.1, "min_solutions": 0}, {"relative_error": 0.1, "min_solutions": 9},
+    {"absolute_error": 0.49, "success_probability": 1}, {"absolute_error": 0.49, "success_probability": 0},
+])
+
+def test_required_counting_qubits_rejects_invalid_bounds(arguments):
+    """Bounds that can never be met (or make no sense) raise instead of looping or returning t=1."""
+    with pytest.raises(ValueError):
+        required_counting_qubits(3, **arguments)
@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+from itertools import product
+from qiskit.quantum_info import Operator
+import tracemalloc
+from Final_Project.enumeration import (subset_sum_table, marked_indices, index_to_bits, SubsetSumIndex,
+                                       subset_sum_histogram)
+from Final_Project.oracle import subset_sum_oracle, batch_subset_sum_oracles
+
+
+# (weights, target, label)
+ENUMERATION_CASES = [
+    ([1, 2, 3], 3, "Standard Case"),
+    ([1, 1, 1, 1], 2, "High Density"),
+    ([2, 2, 2], 1, "Zero Solutions Case"),
+    ([1], 1, "Minimal n=1 Case"),
+    ([2, 4], 0, "Target Zero (Empty Set) Case"),
+    ([3, 5, 7, 2, 8, 1, 4], 11, "Seven Weights"),
+]
+
+def brute_force_indices(weights, target):
+    """Reference enumeration: the original itertools walk, converted to little-endian indices."""
+    found = []
+    for bits in product([0, 1], repeat=len(weights)):
+        if sum(w for b, w in zip(bits, weights) if b) == target:
+            found.append(sum(b << i for i, b in enumerate(bits)))
+    return sorted(found)
+
+
+@pytest.mark.parametrize("weights, target, label", ENUMERATION_CASES)
+
+def test_marked_indices_match_brute_force(weights, target, label):
+    """The vectorized engine must find exactly the bitstrings the Python loop finds."""
+    expected = brute_force_indices(weights, target)
+    assert marked_indices(weights, target).tolist() == expected, f"Failed {label}"
+
+    # Force several chunks to check the streamed path stitches indices correctly
+    assert marked_indices(weights, target, chunk_bits=1).tolist() == expected, f"Failed {label} (chunked)"
+
+
+def test_subset_sum_table_little_endian():
+    """Index bit k selects weights[k] (Qiskit little-endian)."""
+    table = subset_sum_table([1, 10, 100])
+    assert table.tolist() == [0, 1, 10, 11, 100, 101, 110, 111]
+    assert index_to_bits(6, 3) == (0, 1, 1)
+
+
+def test_oracle_consumes_marked_indices():
+    """The oracle diagonal must be -1 exactly on the indices returned by the engine."""
+    weights, target = [3, 5, 7, 2, 8], 10
+    diagonal = np.real(np.diag(Operator(subset_sum_oracle(weights, target)).data))
+
+    expected = np.ones(2 ** len(weights))
+    expected[marked_indices(weights, target)] = -1
+    assert np.allclose(diagonal, expected)
+
+
+@pytest.mark.parametrize("weights, target, label", ENUMERATION_CASES)
+
+def test_subset_sum_index_matches_per_target(weights, target, label):
+    """One bucketed pass must give the same indices and M as enumerating per target."""
+    index = SubsetSumIndex(weights, chunk_bits=2)
+    expected = brute_force_indices(weights, target)
+    assert index.marked_indices(target).tolist() == expected, f"Failed {label}"
+    assert index.count(target) == len(expected), f"Failed {label}"
+
+
+def test_subset_sum_index_histogram():
+    """The buckets partition the search space: the histogram sums to 2^n."""
+    weights = [3, 5, 7, 2, 8, 1, 4]
+    histogram = SubsetSumIndex(weights).histogram()
+    assert sum(histogram.values()) == 2 ** len(weights)
+    assert histogram == {t: len(brute_force_indices(weights, t)) for t in range(sum(weights) + 1)
+                         if brute_force_indices(weights, t)}
+
+
+def test_subset_sum_index_memory_is_bounded():
+    """The peak stays near the int32 index array (4 bytes per bitstring), not a full sort of int64 sums."""
+    rng = np.random.default_rng(7)
+    weights = rng.integers(-5, 20, size=20).tolist()
+    tracemalloc.start()
+    index = SubsetSumIndex(weights, chunk_bits=14)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 6 * 2 ** 20
+
+    # Negative weights and many chunks: the buckets still match the per-target enumeration
+    sums, counts = subset_sum_histogram(weights)
+    assert counts.sum() == 2 ** 20 and np.array_equal(index.sums, sums)
+    for target in sums[::7]:
+        assert np.array_equal(index.marked_indices(target), marked_indices(weights, target))
+
+
+def test_batch_oracles_match_single_builds():
+    """Every oracle handed out by the batch API equals the per-target build, with exact M."""
+    weights = [1, 2, 3, 3]
+    oracles = batch_subset_sum_oracles(weights)
+    assert sorted(oracles) == list(range(sum(weights) + 1))
+
+    for target, (oracle, M) in oracles.items():
+        assert M == len(marked_indices(weights, target))
+        assert Operator(oracle).equiv(Operator(subset_sum_oracle(weights, target)))
+
+    # Targets that are not achievable still get a (no-op) oracle with M = 0
+    oracle, M = batch_subset_sum_oracles(weights, targets=[100])[100]
+    assert M == 0 and oracle.size() == 0
@@ -0,0 +1,61 @@
+import tracemalloc
+import numpy as np
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.counting import quantum_counting_circuit
+from Final_Project.analytic import counting_distribution, sample_counts
+from Final_Project.estimation import likelihood_matrix, posterior_estimate
+from Final_Project.runner import MarginalSampler
+
+# Noiseless counts drawn from cached marginals (one simulation per circuit)
+SAMPLER = MarginalSampler()
+
+
+def test_posterior_accuracy_with_few_shots(scenario):
+    """The whole histogram of 64 shots pins M down as well as the top outcome of 1024."""
+    n, t = scenario.n, 6
+    qc = quantum_counting_circuit(n, subset_sum_oracle(scenario.weights, scenario.target), counting_qubits=t,
+                                  control="kernel")
+    counts = SAMPLER.sample_counts(qc, shots=64, seed=n)
+
+    result = posterior_estimate(counts, n)
+    scenario.check_M(result["M_map"])
+    assert result["interval"][0] <= scenario.expected_M <= result["interval"][1]
+
+
+def test_likelihood_rows_match_counting_distribution():
+    """Each row of the vectorized likelihood is the closed-form outcome distribution."""
+    n, t = 4, 5
+    likelihoods = likelihood_matrix(n, t)
+    assert likelihoods.shape == (2 ** n + 1, 2 ** t)
+    for M in range(2 ** n + 1):
+        assert np.allclose(likelihoods[M], counting_distribution(M, n, t))
+
+
+def test_likelihood_at_observed_outcomes():
+    """Columns restricted to the observed outcomes are the same entries as the full matrix."""
+    n, t, outcomes = 6, 5, [0, 7, 25]
+    assert np.allclose(likelihood_matrix(n, t, outcomes=outcomes), likelihood_matrix(n, t)[:, outcomes])
+
+
+def test_posterior_memory_is_bounded():
+    """n=18, t=8: the posterior over 2^18 + 1 candidates costs megabytes, not a dense N x 2^t matrix."""
+    n, t, M = 18, 8, 1000
+    counts = sample_counts(M, n, t, shots=64, seed=2)
+    tracemalloc.start()
+    result = posterior_estimate(counts, n)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 64 * 2 ** 20
+    assert result["interval"][0] <= M <= result["interval"][1]
+
+
+def test_interval_coverage():
+    """A 95% interval from 32 shots must contain the true M in nearly every run."""
+    n, t, M = 10, 6, 22
+    covered = 0
+    for seed in range(40):
+        result = posterior_estimate(sample_counts(M, n, t, shots=32, seed=seed), n, level=0.95)
+        lo, hi = result["interval"]
+        covered += lo <= M <= hi
+        assert result["mass"] >= 0.95
+    assert covered >= 36
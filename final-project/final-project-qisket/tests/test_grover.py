@@ -1,6 +1,6 @@
 from qiskit import QuantumCircuit
 from qiskit.quantum_info import Statevector
-from Final_Project.oracle import subset_sum_oracle
+from Final_Project.oracle import subset_sum_oracle, subset_sum_adder_oracle
 from Final_Project.grover import grover_iteration
 import numpy as np
 import pytest
@@ -69,4 +69,27 @@ def test_grover_amplification(weights, target, valid_bits, label):
             else:
                 # For n > 1, Grover MUST strictly increase the probability
                 assert final_prob > initial_prob, \
-                    f"Failed {label}: {bits} not amplified ({final_prob} <= {initial_prob})"
\ No newline at end of file
+                    f"Failed {label}: {bits} not amplified ({final_prob} <= {initial_prob})"
+
+@pytest.mark.parametrize("weights, target, valid_bits, label", GROVER_TEST_CASES)
+
+def test_grover_adder_oracle_matches(weights, target, valid_bits, label):
+    """
+    With the arithmetic oracle, one Grover iteration must give the search register
+    the same state as with the enumerated oracle, leaving the sum register in |0>.
+    """
+    n = len(weights)
+    adder = subset_sum_adder_oracle(weights, target)
+
+    qc = QuantumCircuit(adder.num_qubits)
+    qc.h(range(n))
+    qc.compose(grover_iteration(adder, n), inplace=True)
+    state = Statevector.from_instruction(qc).data
+
+    reference = QuantumCircuit(n)
+    reference.h(range(n))
+    reference.compose(grover_iteration(subset_sum_oracle(weights, target)), inplace=True)
+    expected = Statevector.from_instruction(reference).data
+
+    # Ancillas are the high qubits: the first 2^n amplitudes hold the whole state
+    assert np.allclose(state[:2 ** n], expected), f"Failed {label}"
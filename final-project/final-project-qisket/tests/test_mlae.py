@@ -0,0 +1,31 @@
+import numpy as np
+from Final_Project.mlae import (exponential_schedule, count_hits, fit_theta, qpe_oracle_calls,
+                                ml_amplitude_estimation)
+
+
+def test_mlae_accuracy(scenario):
+    """Uncontrolled Grover runs plus a likelihood fit must recover M without any QFT."""
+    scenario.check_M(ml_amplitude_estimation(scenario.weights, scenario.target, shots=100, seed=3)["M"])
+
+
+def test_mlae_uses_fewer_oracle_calls_than_qpe():
+    """For the same angular error, the exponential schedule beats QPE's 2^t - 1 calls per shot."""
+    result = ml_amplitude_estimation([3, 5, 7, 2, 8, 1], 11, schedule=exponential_schedule(5), shots=100, seed=3)
+    assert result["M"] == 4
+    assert result["oracle_calls"] == 100 * (0 + 1 + 2 + 4 + 8)
+    assert result["oracle_calls"] < result["qpe_oracle_calls"]
+
+
+def test_fit_theta_on_exact_frequencies():
+    """Noise-free hit counts must give back the true angle."""
+    theta = np.arcsin(np.sqrt(3 / 64))
+    schedule, shots = exponential_schedule(6), 10 ** 6
+    hits = [round(shots * np.sin((2 * m + 1) * theta) ** 2) for m in schedule]
+    assert abs(fit_theta(schedule, hits, shots) - theta) < 1e-4
+
+
+def test_count_hits_and_qpe_calls():
+    """Hits are verified classically on little-endian bitstrings; QPE needs t with pi/2^t <= error."""
+    # '011' -> index 3 -> weights[0] + weights[1] = 3, '100' -> weights[2] = 3
+    assert count_hits({"011": 5, "100": 7, "111": 2}, [1, 2, 3], 3) == 12
+    assert qpe_oracle_calls(np.pi / 64) == (6, 63)
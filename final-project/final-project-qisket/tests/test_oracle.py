@@ -1,7 +1,8 @@
 import pytest
+import numpy as np
 from itertools import product 
 from qiskit.quantum_info import Statevector
-from Final_Project.oracle import subset_sum_oracle
+from Final_Project.oracle import subset_sum_oracle, subset_sum_adder_oracle, sum_register_size
 
 
 # Define our Test Library (Weights, Target, Expected Solutions)
@@ -13,14 +14,18 @@ TEST_CASES = [
     ([2, 4], 0, [(0,0)], "Target Zero (Empty Set) Case")
 ]
 
+# Every oracle construction must implement the same phase flips
+ORACLE_MODES = ["per_state", "esop", "gray", "diagonal"]
+
 def get_amplitude_index(bits):
     """Qiskit uses little-endian: (1,0,0) is index 1, (0,1,0) is index 2."""
     return sum(b << i for i, b in enumerate(bits))
 
 # Runs the test function 5 separate times, once for each case above.
 @pytest.mark.parametrize("weights, target, valid_bits, label", TEST_CASES)
+@pytest.mark.parametrize("mode", ORACLE_MODES)
 
-def test_oracle_scenarios(weights, target, valid_bits, label):
+def test_oracle_scenarios(weights, target, valid_bits, label, mode):
     """
     Encompassing test suite that verifies the phase-flip logic for the Oracle.
     
@@ -31,7 +36,7 @@ def test_oracle_scenarios(weights, target, valid_bits, label):
     n = len(weights)
 
     # Generate the Oracle circuit based on the current test case
-    oracle = subset_sum_oracle(weights, target)
+    oracle = subset_sum_oracle(weights, target, mode=mode)
     
     # Iterate through every possible state in the 2^n search space
     for bits in product([0, 1], repeat=n):
@@ -49,4 +54,41 @@ def test_oracle_scenarios(weights, target, valid_bits, label):
             assert amplitude < 0, f"Failed {label}: Bitstring {bits} should be flipped"
         else:
             # Non-solution states MUST stay positive
-            assert amplitude > 0, f"Failed {label}: Bitstring {bits} should NOT be flipped"
\ No newline at end of file
+            assert amplitude > 0, f"Failed {label}: Bitstring {bits} should NOT be flipped"
+
+@pytest.mark.parametrize("weights, target, valid_bits, label", TEST_CASES)
+
+def test_adder_oracle_scenarios(weights, target, valid_bits, label):
+    """
+    The arithmetic oracle must flip the same states as the lookup-table oracle
+    and hand its sum-register ancillas back in |0>.
+    """
+    n = len(weights)
+    oracle = subset_sum_adder_oracle(weights, target)
+    ancillas = oracle.num_qubits - n
+
+    for bits in product([0, 1], repeat=n):
+        # Ancillas are the high qubits, so they sit on the left of the label
+        sv = Statevector.from_label('0' * ancillas + ''.join(map(str, bits[::-1])))
+        evolved_sv = sv.evolve(oracle)
+
+        index = get_amplitude_index(bits)
+        amplitude = evolved_sv.data[index]
+        assert np.isclose(abs(amplitude), 1.0), f"Failed {label}: ancillas not uncomputed for {bits}"
+
+        if bits in valid_bits:
+            assert amplitude.real < 0, f"Failed {label}: Bitstring {bits} should be flipped"
+        else:
+            assert amplitude.real > 0, f"Failed {label}: Bitstring {bits} should NOT be flipped"
+
+
+def test_adder_oracle_is_polynomial():
+    """Size grows with n * log2(sum(weights)), not with 2^n or the number of solutions."""
+    weights = list(range(1, 31))  # n = 30: far too large to enumerate
+    oracle = subset_sum_adder_oracle(weights, sum(weights) // 2)
+    n, s = len(weights), oracle.num_qubits - len(weights)
+
+    assert s == sum_register_size(weights, sum(weights) // 2)
+    ops = oracle.count_ops()
+    assert ops["cp"] <= 2 * (n * s + s * s)
+    assert ops["mcx"] == 1
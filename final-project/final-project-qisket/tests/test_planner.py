@@ -0,0 +1,107 @@
+import logging
+import numpy as np
+import pytest
+from Final_Project.planner import (estimate_memory, plan_simulation, plan_counting, require_plan,
+                                   planned_simulator, default_memory_budget)
+from Final_Project.runner import adaptive_counting_run, MarginalSampler
+from Final_Project.cache import cached_counting_circuit
+from Final_Project.analytic import counting_distribution
+from Final_Project.enumeration import count_solutions
+from Final_Project.sweep import sweep_grid, run_instance
+
+MiB = 2 ** 20
+
+
+def test_estimates():
+    """Statevector doubles per qubit and halves in single precision; MPS grows linearly."""
+    assert estimate_memory(20) == 2 * 16 * 2 ** 20
+    assert estimate_memory(20, precision="single") == estimate_memory(20) // 2
+    assert estimate_memory(40, "matrix_product_state") == 2 * 16 * 40 * 2 * 256 ** 2
+    assert estimate_memory(41, "matrix_product_state") - estimate_memory(40, "matrix_product_state") == \
+        2 * 16 * 2 * 256 ** 2
+    assert estimate_memory(50, "analytic", counting_qubits=6) == 2 * 16 * 2 * 2 ** 6
+
+
+def test_decision_order(caplog):
+    """Statevector, then the analytic path, then MPS (opt-in only), then refusal; every decision is logged."""
+    with caplog.at_level(logging.INFO, logger="Final_Project.planner"):
+        assert plan_simulation(10, budget=MiB)["method"] == "statevector"
+        assert plan_simulation(40, budget=MiB, counting_qubits=6, analytic=True)["method"] == "analytic"
+        assert plan_simulation(40, budget=256 * MiB, allow_mps=True)["method"] == "matrix_product_state"
+        assert plan_simulation(40, budget=MiB, allow_mps=True)["method"] == "refuse"
+        assert plan_simulation(40, budget=256 * MiB)["method"] == "refuse"
+    assert [record.getMessage().split("-> ")[1].split(" ")[0] for record in caplog.records] == \
+        ["statevector", "analytic", "matrix_product_state", "refuse", "refuse"]
+    assert [record.levelno for record in caplog.records] == [logging.INFO] * 2 + [logging.WARNING] * 3
+    assert "approximate" in caplog.records[2].getMessage()
+
+
+def test_mps_plans_are_flagged_approximate():
+    """A bond cap below 2^(q/2) truncates the state; at or above it the MPS is exact."""
+    assert plan_simulation(40, budget=256 * MiB, allow_mps=True)["approximate"]
+    assert not plan_simulation(10, allow_mps=True, max_bond_dimension=32, budget=MiB)["approximate"]
+    assert not plan_simulation(10, budget=MiB)["approximate"]
+
+
+def test_refusal_raises_before_allocating():
+    plan = plan_simulation(60, budget=MiB)
+    with pytest.raises(MemoryError):
+        require_plan(plan)
+    with pytest.raises(MemoryError):
+        planned_simulator(plan)
+    with pytest.raises(ValueError):
+        planned_simulator(plan_simulation(60, budget=MiB, counting_qubits=4, analytic=True))
+
+
+def test_planned_simulator_options():
+    simulator = planned_simulator(plan_simulation(40, "single", budget=256 * MiB, allow_mps=True))
+    assert simulator.options.method == "matrix_product_state"
+    assert simulator.options.precision == "single"
+    assert simulator.options.matrix_product_state_max_bond_dimension == 256
+
+
+def test_budget_from_environment(monkeypatch):
+    monkeypatch.setenv("FINAL_PROJECT_MEMORY_BUDGET", "1e6")
+    assert default_memory_budget() == 10 ** 6
+    assert plan_counting([1, 2, 3], 3, 6)["method"] == "statevector"
+    assert plan_counting([1] * 30, 15, 6)["method"] == "analytic"
+
+
+def test_runner_under_small_budget(scenario):
+    """A budget that only fits the 2^t x 2 subspace state still gets the right M, analytically."""
+    result = adaptive_counting_run(scenario.weights, scenario.target, counting_qubits=6, seed=1, budget=2 ** 12)
+    # (n=1: the 7-qubit statevector is the same size as the subspace state, and is preferred)
+    assert result["method"] == ("analytic" if scenario.n > 1 else "statevector")
+    scenario.check_M(result["M"])
+
+
+def test_wide_instance_never_allocates():
+    """40 weights (a 46-qubit circuit, 2 PiB as a statevector) run analytically in the runner and sweep."""
+    # M = N / 2 puts both eigenphases exactly on the 6-bit grid
+    weights = [1] + [0] * 39
+    result = adaptive_counting_run(weights, 1, counting_qubits=6, seed=1, max_shots=256)
+    assert result["method"] == "analytic" and result["M"] == 2 ** 39
+
+    record = run_instance(sweep_grid([weights], targets=[[1]], counting_qubits=[6], shots=[256])[0], seed=1)
+    assert record["method"] == "analytic" and record["correct"]
+
+
+def test_marginal_sampler_mps_only_on_request(monkeypatch, caplog):
+    """Over the budget the sampler refuses, unless MPS is accepted; its marginal is then flagged approximate."""
+    # A small bond cap makes MPS cheaper than the statevector at this width
+    monkeypatch.setattr("Final_Project.planner.DEFAULT_MAX_BOND_DIMENSION", 4)
+    weights, target, t = [1, 2, 3, 4, 5, 6], 6, 6
+    qc = cached_counting_circuit(weights, target, t, control="kernel")
+    exact = counting_distribution(count_solutions(weights, target), len(weights), t)
+    assert np.allclose(MarginalSampler().marginal(qc), exact)
+
+    monkeypatch.setenv("FINAL_PROJECT_MEMORY_BUDGET", str(estimate_memory(qc.num_qubits) // 2))
+    with pytest.raises(MemoryError):
+        MarginalSampler().marginal(qc)
+
+    sampler = MarginalSampler(allow_mps=True)
+    with caplog.at_level(logging.WARNING, logger="Final_Project.planner"):
+        truncated = sampler.marginal(qc)
+    assert sampler.is_approximate(qc) and "matrix_product_state" in caplog.text
+    # Bond dimension 4 is far below the 2^6 this state needs: the truncated marginal is not the exact one
+    assert 0.5 * np.abs(truncated - exact).sum() > 0.1
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.counting import quantum_counting_circuit, iterative_counting_circuit
+from Final_Project.analytic import counting_distribution
+from Final_Project.runner import (adaptive_counting_run, decoded_counts, leading_margin, MarginalSampler,
+                                 counting_simulator, precision_guard)
+
+
+def test_adaptive_run_accuracy(scenario):
+    """Sequential stopping finds the same M as test_system_accuracy with a fraction of its 1024 shots."""
+    result = adaptive_counting_run(scenario.weights, scenario.target, counting_qubits=6, seed=5)
+    scenario.check_M(result["M"])
+    assert result["shots"] + result["shots_saved"] == 1024
+    assert result["shots"] < 1024 and sum(result["counts"].values()) == result["shots"]
+
+
+def test_adaptive_run_respects_budget():
+    """An unreachable confidence runs exactly up to max_shots, in whole batches."""
+    result = adaptive_counting_run([3, 5, 7, 2, 8, 1], 11, counting_qubits=3, batch_shots=16,
+                                   max_shots=64, confidence=1 - 1e-12, seed=1)
+    assert result["shots"] == 64 and result["batches"] == 4 and result["shots_saved"] == 0
+
+
+def test_near_tie_keeps_confidence():
+    """Two decoded Ms at 0.415 and 0.402: repeated looks must not declare a winner much more than 1% of the time."""
+    weights, target = [4, 9, 3, 5, 3, 2, 5, 9, 3, 5], 18  # M = 30
+    runs = 400
+    early = sum(adaptive_counting_run(weights, target, counting_qubits=6, confidence=0.99, seed=seed,
+                                      budget=2 ** 12)["shots"] < 1024 for seed in range(0, 100 * runs, 100))
+    assert early / runs <= 0.03
+
+
+def test_votes_group_mirror_outcomes():
+    """m and 2^t - m decode to the same M and share one vote."""
+    votes = decoded_counts({"001011": 10, "110101": 12, "000000": 3}, 3, 6)
+    assert votes[2] == 22 and votes[0] == 3
+    assert leading_margin(votes) == pytest.approx(19 / 25 ** 0.5)
+
+
+def test_sampler_reuses_marginal():
+    """The marginal matches the closed form and is simulated once per circuit fingerprint."""
+    sampler = MarginalSampler()
+    weights, target, t = [1, 2, 3, 4, 5], 7, 5
+    build = lambda: quantum_counting_circuit(len(weights), subset_sum_oracle(weights, target),
+                                             counting_qubits=t, control="kernel")
+
+    assert np.allclose(sampler.marginal(build()), counting_distribution(3, len(weights), t))
+    # A rebuilt (identical) circuit, new shot counts and new seeds only sample
+    for shots, seed in [(10, 1), (1000, 2), (100000, 3)]:
+        counts = sampler.sample_counts(build(), shots=shots, seed=seed)
+        assert sum(counts.values()) == shots and all(len(key) == t for key in counts)
+    assert (sampler.misses, sampler.hits) == (1, 3)
+
+    # Same seed, same draw
+    assert sampler.sample_counts(build(), 50, seed=4) == sampler.sample_counts(build(), 50, seed=4)
+
+
+def test_sampler_rejects_mid_circuit_measurement():
+    """Iterative phase estimation measures mid-circuit, so there is no single marginal to cache."""
+    qc = iterative_counting_circuit(3, subset_sum_oracle([1, 2, 3], 3), counting_qubits=3)
+    with pytest.raises(ValueError):
+        MarginalSampler().marginal(qc)
+
+
+def test_adaptive_run_with_sampler(scenario):
+    """Batches drawn from the cached marginal: one simulation per instance however many batches."""
+    sampler = MarginalSampler()
+    result = adaptive_counting_run(scenario.weights, scenario.target, counting_qubits=6, seed=5, sampler=sampler)
+    scenario.check_M(result["M"])
+    assert sampler.misses == 1 and sampler.hits == result["batches"] - 1
+
+
+def test_adaptive_run_fingerprints_once(monkeypatch):
+    """The circuit is hashed once per run, not once per batch."""
+    import Final_Project.runner as runner
+    calls = []
+    fingerprint = runner.circuit_fingerprint
+    monkeypatch.setattr(runner, "circuit_fingerprint", lambda circuit: calls.append(1) or fingerprint(circuit))
+
+    result = adaptive_counting_run([1, 2, 3], 3, counting_qubits=6, seed=5, sampler=MarginalSampler(),
+                                   min_shots=256, max_shots=256)
+    assert result["batches"] == 16 and len(calls) == 1
+
+
+def test_precision_guard_passes_on_calibration_set():
+    """complex64 marginals agree with complex128 far below the default tolerance, with the same M."""
+    report = precision_guard(counting_qubits=6)
+    assert report["passed"] and not report["mismatches"]
+    assert 0 < report["max_probability_error"] < 1e-5
+
+
+def test_single_precision_run(scenario):
+    """The runner simulates in single precision once the guard has passed."""
+    result = adaptive_counting_run(scenario.weights, scenario.target, counting_qubits=6, precision="single", seed=1)
+    scenario.check_M(result["M"])
+    assert result["precision"] == "single"
+    assert counting_simulator("single").options.precision == "single"
+
+
+def test_failed_guard_falls_back_to_double():
+    """A tolerance single precision cannot meet triggers a warning and a double-precision run."""
+    with pytest.warns(UserWarning):
+        result = adaptive_counting_run([1, 2, 3], 3, counting_qubits=6, precision="single", tolerance=0.0, seed=1)
+    assert result["M"] == 2 and result["precision"] == "double"
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+from Final_Project.oracle import subset_sum_oracle, subset_sum_adder_oracle
+from Final_Project.grover import grover_iteration
+from Final_Project.counting import quantum_counting_circuit, estimate_solutions, logical_counting_circuit
+from Final_Project.enumeration import marked_indices, count_solutions
+from Final_Project.analytic import counting_distribution
+from Final_Project.subspace import SubspaceSimulator
+from Final_Project.vector_engine import VectorGroverEngine
+
+
+def test_counting_statevector_matches_qiskit(scenario):
+    """The expanded 2-amplitude state must equal Qiskit's statevector, phases included."""
+    t = 3
+    qc = quantum_counting_circuit(scenario.n, subset_sum_oracle(scenario.weights, scenario.target),
+                                  counting_qubits=t, control="kernel")
+    simulator = SubspaceSimulator.from_circuit(qc)
+    scenario.check_M(simulator.M)
+
+    qc = logical_counting_circuit(qc)
+    expanded = simulator.expand_counting_statevector(t, marked_indices(scenario.weights, scenario.target))
+    assert np.allclose(Statevector(qc).data, expanded, atol=1e-9), f"Failed {scenario.label}"
+
+
+def test_subspace_system_accuracy(scenario):
+    """Same post-processing as test_system_accuracy, on counts from the subspace simulator."""
+    t = 6
+    qc = quantum_counting_circuit(scenario.n, subset_sum_oracle(scenario.weights, scenario.target),
+                                  counting_qubits=t, control="kernel")
+    counts = SubspaceSimulator.from_circuit(qc).run(qc, shots=1024, seed=1)
+    assert sum(counts.values()) == 1024
+    scenario.check_counts(counts, t)
+
+
+def test_grover_state_matches_qiskit():
+    """k Grover iterations in the subspace give the same success probability as the full circuit."""
+    weights, target = [3, 5, 7, 2, 8], 10
+    n = len(weights)
+    grover = grover_iteration(subset_sum_oracle(weights, target), n)
+    simulator = SubspaceSimulator.from_circuit(grover)
+    marked = marked_indices(weights, target)
+
+    qc = QuantumCircuit(n)
+    qc.h(range(n))
+    for k in range(4):
+        probabilities = Statevector(qc).probabilities()
+        assert np.isclose(simulator.grover_success_probability(k), probabilities[marked].sum())
+        qc.compose(grover, inplace=True)
+
+
+def test_adder_oracle_metadata_is_enough():
+    """The adder oracle carries no marked_count: M comes from weights and target instead."""
+    qc = quantum_counting_circuit(3, subset_sum_adder_oracle([1, 2, 3], 3), counting_qubits=4, control="kernel")
+    assert SubspaceSimulator.from_circuit(qc).M == 2
+
+
+def test_approximate_iqft_is_not_simulated_as_exact():
+    """The cutoff changes the distribution, so the metadata-driven engines refuse it instead of ignoring it."""
+    qc = quantum_counting_circuit(6, subset_sum_oracle([1, 2, 3, 4, 5, 6], 6, mode="diagonal"), counting_qubits=6,
+                                  control="kernel", approximation_degree=4)
+    assert qc.metadata["approximation_degree"] == 4
+    for engine in (SubspaceSimulator, VectorGroverEngine):
+        with pytest.raises(ValueError):
+            engine.from_circuit(qc)
+    with pytest.raises(ValueError):
+        SubspaceSimulator(5, 6).run(qc)
+    with pytest.raises(ValueError):
+        VectorGroverEngine.from_problem([1, 2, 3, 4, 5, 6], 6).run(qc)
+
+
+def test_forty_qubit_counting():
+    """n=40 is far beyond statevector simulation but only costs 2^t 2x2 products here."""
+    weights, target, t = list(range(1, 41)), 410, 12
+    simulator = SubspaceSimulator(count_solutions(weights, target), len(weights))
+
+    # The subspace result agrees with the closed-form QPE distribution
+    assert np.allclose(simulator.counting_probabilities(t),
+                       counting_distribution(simulator.M, len(weights), t), atol=1e-9)
+
+    counts = simulator.counting_counts(t, shots=2048, seed=3)
+    estimate = estimate_solutions(int(max(counts, key=counts.get), 2), len(weights), t)
+    assert abs(estimate - simulator.M) / simulator.M < 0.01
@@ -0,0 +1,96 @@
+import json
+import logging
+import pytest
+from Final_Project.sweep import (sweep_grid, instance_id, run_instance, run_sweep, completed_ids,
+                                 RecordSink, RECORD_FIELDS)
+from Final_Project.planner import plan_counting
+
+
+def test_run_instance_accuracy(scenario):
+    """One instance in-process: the record carries the estimate and the exact M."""
+    spec = sweep_grid([scenario.weights], targets=[[scenario.target]], counting_qubits=[6], shots=[1024])[0]
+    record = run_instance(spec, seed=1)
+    assert record["M_exact"] == scenario.expected_M
+    scenario.check_M(record["M_estimate"])
+    assert record["correct"]
+    assert set(RECORD_FIELDS) <= set(record) and record["id"] == instance_id(spec)
+
+
+@pytest.mark.parametrize("suffix", ["jsonl", "csv"])
+
+def test_sweep_streams_and_resumes(tmp_path, suffix):
+    """A partial sweep followed by the full one runs every instance exactly once."""
+    output = str(tmp_path / f"sweep.{suffix}")
+    instances = sweep_grid([[1, 2, 3], [2, 2]], counting_qubits=[4], shots=[128])
+    assert len(instances) == 7 + 5
+
+    assert run_sweep(instances[:5], output, workers=2, seed=1) == {"run": 5, "skipped": 0, "failed": 0}
+    assert run_sweep(instances, output, workers=2, seed=1) == {"run": 7, "skipped": 5, "failed": 0}
+    assert run_sweep(instances, output, workers=2, seed=1) == {"run": 0, "skipped": 12, "failed": 0}
+    assert completed_ids(output) == {instance_id(spec) for spec in instances}
+
+
+def test_budget_is_split_across_workers(tmp_path):
+    """Each worker plans against budget // workers: a budget that fits one statevector, split two ways, does not."""
+    instances = sweep_grid([[1, 2]], targets=[[3]], counting_qubits=[3], shots=[64])
+    statevector = plan_counting([1, 2], 3, 3)["statevector_bytes"]
+    budget = 2 * statevector - 2
+
+    for workers, method in ((1, "statevector"), (2, "analytic")):
+        output = str(tmp_path / f"sweep-{workers}.jsonl")
+        run_sweep(instances, output, workers=workers, seed=1, budget=budget)
+        with open(output) as f:
+            record = json.loads(f.readline())
+        assert record["method"] == method and record["correct"]
+
+    assert run_instance(instances[0], seed=1, budget=statevector - 1)["method"] == "analytic"
+
+
+def test_failed_instance_does_not_abort(tmp_path, caplog):
+    """An instance that raises is logged and skipped; the others still reach the sink."""
+    output = str(tmp_path / "sweep.jsonl")
+    instances = sweep_grid([[1, 2]], counting_qubits=[3], shots=[64])
+    instances.append(dict(instances[0], mode="no-such-mode"))
+
+    with caplog.at_level(logging.ERROR, logger="Final_Project.sweep"):
+        assert run_sweep(instances, output, workers=2, seed=1) == {"run": 4, "skipped": 0, "failed": 1}
+    assert instance_id(instances[-1]) in caplog.text
+    assert completed_ids(output) == {instance_id(spec) for spec in instances[:-1]}
+
+
+@pytest.mark.parametrize("suffix", ["jsonl", "csv"])
+
+def test_resume_after_truncated_record(tmp_path, suffix):
+    """A partial last line left by a crash is not counted as done and is dropped before appending."""
+    path = str(tmp_path / f"records.{suffix}")
+    record = {field: 0 for field in RECORD_FIELDS}
+    with RecordSink(path) as sink:
+        sink.write(dict(record, id="abc", weights=[1]))
+    with open(path, "a") as f:
+        f.write('{"id": "def", "weig' if suffix == "jsonl" else "def,[1")
+
+    assert completed_ids(path) == {"abc"}
+    with RecordSink(path) as sink:
+        sink.write(dict(record, id="ghi", weights=[1]))
+    assert completed_ids(path) == {"abc", "ghi"}
+
+
+def test_record_sink_formats(tmp_path):
+    """JSONL lines and CSV rows hold the same fields; weights survive the CSV as JSON."""
+    record = {"id": "abc", "weights": [1, 2], "target": 3, "counting_qubits": 4, "shots": 8, "mode": "per_state",
+              "control": "kernel", "measured": 5, "M_estimate": 1, "M_exact": 1, "correct": True, "method": "statevector",
+              "seconds": 0.1}
+    for suffix in ("jsonl", "csv"):
+        path = str(tmp_path / f"records.{suffix}")
+        with RecordSink(path) as sink:
+            sink.write(record)
+        with RecordSink(path) as sink:
+            sink.write(dict(record, id="def"))
+        assert completed_ids(path) == {"abc", "def"}
+
+    with open(tmp_path / "records.jsonl") as f:
+        assert json.loads(f.readline()) == record
+    with open(tmp_path / "records.csv") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == ",".join(RECORD_FIELDS) and len(lines) == 3
+    assert '"[1, 2]"' in lines[1]
@@ -0,0 +1,105 @@
+import random
+import pytest
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.enumeration import marked_indices
+from Final_Project.synthesis import esop_cover, gray_tour, synthesis_report
+from Final_Project.tests.test_counting import FINAL_TEST_SUITE
+
+
+# Larger random instances (fixed seed) where many solutions share sub-patterns.
+# A local generator leaves the global random state of other test modules alone.
+_rng = random.Random(7)
+RANDOM_INSTANCES = []
+for n in (6, 7, 8):
+    weights = [_rng.randint(1, 6) for _ in range(n)]
+    RANDOM_INSTANCES.append((weights, sum(weights) // 2, f"Random n={n}"))
+
+REPORT_INSTANCES = [(w, t, label) for w, t, _, label in FINAL_TEST_SUITE] + RANDOM_INSTANCES
+
+
+def cover_indices(cubes, n):
+    """Expands an ESOP cover back into the set of states it flips an odd number of times."""
+    parity = np.zeros(2 ** n, dtype=int)
+    for idx in range(2 ** n):
+        parity[idx] = sum(1 for mask, value in cubes if idx & mask == value & mask) % 2
+    return np.flatnonzero(parity).tolist()
+
+
+@pytest.mark.parametrize("weights, target, label", REPORT_INSTANCES)
+
+def test_esop_cover_is_exact(weights, target, label):
+    """The XOR of all cubes must mark exactly the valid subsets - no more, no less."""
+    n = len(weights)
+    indices = marked_indices(weights, target)
+    assert cover_indices(esop_cover(indices, n), n) == indices.tolist(), f"Failed {label}"
+
+    # The minterm-only path (used for large n) must be exact too
+    assert cover_indices(esop_cover(indices, n, max_exact_vars=0), n) == indices.tolist(), f"Failed {label}"
+
+
+@pytest.mark.parametrize("weights, target, label", REPORT_INSTANCES)
+
+def test_esop_reduces_gate_count(weights, target, label):
+    """
+    Synthesis Report:
+    The ESOP oracle must be unitarily identical to the per-state oracle and never larger.
+    """
+    # Both oracles are diagonal, so their action on |+>^n fixes every phase
+    n = len(weights)
+    states = []
+    for mode in ("per_state", "esop"):
+        qc = QuantumCircuit(n)
+        qc.h(range(n))
+        qc.compose(subset_sum_oracle(weights, target, mode=mode), inplace=True)
+        states.append(Statevector.from_instruction(qc))
+    assert np.allclose(states[1].data, states[0].data), f"Failed {label}: oracles differ"
+
+    report = synthesis_report(weights, target)
+    assert report["esop"]["size"] <= report["per_state"]["size"], f"Failed {label}: {report}"
+    assert report["esop"]["depth"] <= report["per_state"]["depth"], f"Failed {label}: {report}"
+
+
+def test_esop_high_density_reduction():
+    """[1,1,1,1] target 2 (M=6) shares literals across solutions, so ESOP must strictly win."""
+    report = synthesis_report([1, 1, 1, 1], 2)
+    assert report["esop"]["cx"] < report["per_state"]["cx"]
+    assert report["esop"]["depth"] < report["per_state"]["depth"]
+
+
+def test_gray_tour_visits_every_state_once():
+    """The tour is a permutation of the marked states (large sets use pure Gray-code order)."""
+    indices = marked_indices([1, 2, 3, 4, 5, 6, 7, 8], 12)
+    assert sorted(gray_tour(indices, 8)) == indices.tolist()
+
+
+@pytest.mark.parametrize("weights, target, label", REPORT_INSTANCES)
+
+def test_gray_order_cuts_x_layers(weights, target, label):
+    """
+    Gate-count comparison:
+    The Gray-ordered oracle keeps the same MCZs but never uses more X gates or depth.
+    """
+    per_state = subset_sum_oracle(weights, target, mode="per_state").count_ops()
+    gray = subset_sum_oracle(weights, target, mode="gray").count_ops()
+    assert gray.get("mcx", 0) == per_state.get("mcx", 0), f"Failed {label}"
+    assert gray.get("x", 0) <= per_state.get("x", 0), f"Failed {label}: {gray} vs {per_state}"
+
+    report = synthesis_report(weights, target, modes=("per_state", "gray"))
+    assert report["gray"]["depth"] <= report["per_state"]["depth"], f"Failed {label}: {report}"
+
+
+def test_gray_order_high_density_reduction():
+    """
+    [1,1,1,1] target 2: the six weight-2 states are at least 2 bits apart, so the best tour
+    costs 2 (entry) + 5 * 2 (transitions) + 2 (exit) = 14 X gates instead of 6 * 4 = 24.
+    """
+    per_state = subset_sum_oracle([1, 1, 1, 1], 2, mode="per_state").count_ops()
+    gray = subset_sum_oracle([1, 1, 1, 1], 2, mode="gray").count_ops()
+    assert per_state["x"] == 24
+    assert gray["x"] == 14
+
+    report = synthesis_report([1, 1, 1, 1], 2, modes=("per_state", "gray"))
+    assert report["gray"]["depth"] < report["per_state"]["depth"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from qiskit.quantum_info import Operator
+from qiskit_aer import AerSimulator
+from Final_Project.oracle import (subset_sum_adder_oracle, subset_sum_adder_oracle_template,
+                                  target_flip_values, sum_register_size)
+from Final_Project.template import CountingTemplate
+from Final_Project.enumeration import SubsetSumIndex
+from Final_Project.counting import estimate_solutions
+from Final_Project.cache import CircuitCache
+
+
+@pytest.mark.parametrize("weights", [[1, 2, 3], [2, 2], [1]])
+
+def test_bound_template_equals_adder_oracle(weights):
+    """Binding the comparator angles must give exactly the adder oracle for that target."""
+    template, theta = subset_sum_adder_oracle_template(weights)
+    sum_bits = sum_register_size(weights, 0)
+
+    for target in range(sum(weights) + 1):
+        bound = template.assign_parameters(dict(zip(theta, target_flip_values(target, sum_bits))))
+        expected = subset_sum_adder_oracle(weights, target)
+        assert np.allclose(Operator(bound).data, Operator(expected).data), f"Failed target {target}"
+
+
+def test_target_sweep_transpiles_once():
+    """
+    Target Sweep:
+    Every target in 0..sum(weights) reuses the single transpiled template and counts M exactly.
+    """
+    weights, t = [1, 2, 3], 5
+    backend = AerSimulator()
+    cache = CircuitCache()
+    index = SubsetSumIndex(weights)
+
+    template = CountingTemplate(weights, counting_qubits=t, backend=backend, cache=cache)
+    misses = cache.misses
+
+    for target in range(sum(weights) + 1):
+        counts = backend.run(template.bind(target), shots=1024, seed_simulator=5).result().get_counts()
+        measured_int = int(max(counts, key=counts.get), 2)
+        assert estimate_solutions(measured_int, len(weights), t) == index.count(target), f"Failed target {target}"
+
+    # A second template for the same weights is a pure cache hit
+    CountingTemplate([3, 2, 1], counting_qubits=t, backend=backend, cache=cache)
+    assert cache.misses == misses
+
+
+def test_template_rejects_unreachable_target():
+    """Targets above sum(weights) would wrap around the sum register."""
+    template = CountingTemplate([1, 2], counting_qubits=2, cache=CircuitCache())
+    with pytest.raises(ValueError):
+        template.bind(4)
@@ -0,0 +1,89 @@
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+from Final_Project.oracle import subset_sum_oracle
+from Final_Project.grover import grover_iteration
+from Final_Project.counting import quantum_counting_circuit, logical_counting_circuit, controlled_grover
+from Final_Project.analytic import counting_distribution
+from Final_Project.vector_engine import VectorGroverEngine, benchmark_against_aer
+
+
+def test_counting_statevector_matches_qiskit(scenario):
+    """Branch-wise controlled G plus an FFT must reproduce the circuit's statevector."""
+    t = 3
+    qc = quantum_counting_circuit(scenario.n, subset_sum_oracle(scenario.weights, scenario.target),
+                                  counting_qubits=t, control="kernel")
+    engine = VectorGroverEngine.from_circuit(qc)
+
+    qc = logical_counting_circuit(qc)
+    state = Statevector(qc)
+    assert np.allclose(state.data, engine.counting_statevector(t), atol=1e-9), f"Failed {scenario.label}"
+
+    # The O(N)-memory marginal agrees with the full state
+    assert np.allclose(state.probabilities(list(range(t))), engine.counting_probabilities(t)), f"Failed {scenario.label}"
+
+
+def test_vector_system_accuracy(scenario):
+    """Same post-processing as test_system_accuracy, on counts from the vector engine."""
+    t = 6
+    qc = quantum_counting_circuit(scenario.n, subset_sum_oracle(scenario.weights, scenario.target),
+                                  counting_qubits=t, control="kernel")
+    scenario.check_counts(VectorGroverEngine.from_circuit(qc).run(qc, shots=1024, seed=1), t)
+
+
+def test_counting_probabilities_at_high_precision():
+    """The lag-FFT marginal matches the closed form at t=12, where a dense T x T sum would take minutes."""
+    engine = VectorGroverEngine.from_problem([3, 5, 7, 2, 8, 1], 11)
+    assert np.allclose(engine.counting_probabilities(12), counting_distribution(len(engine.marked), 6, 12),
+                       atol=1e-9)
+
+
+def test_grover_iterations_match_qiskit():
+    """In-place O and D give the statevector of repeated grover_iteration circuits."""
+    weights, target = [3, 5, 7, 2, 8], 10
+    n = len(weights)
+    grover = grover_iteration(subset_sum_oracle(weights, target), n)
+    engine = VectorGroverEngine.from_circuit(grover)
+
+    qc = QuantumCircuit(n)
+    qc.h(range(n))
+    engine.reset()
+    for _ in range(3):
+        qc.compose(grover, inplace=True)
+        engine.apply_grover(1)
+        assert np.allclose(Statevector(qc).data, engine.state)
+
+
+def test_controlled_grover_matches_qiskit():
+    """The (2, N) controlled kernel equals the controlled_grover gate with the control in |+>."""
+    weights, target, power = [1, 2, 3], 3, 2
+    n = len(weights)
+    oracle = subset_sum_oracle(weights, target)
+    engine = VectorGroverEngine.from_problem(weights, target)
+
+    qc = QuantumCircuit(n + 1)
+    qc.h(range(n + 1))
+    qc.append(controlled_grover(oracle, power, n), range(n + 1))
+
+    state = np.empty((2, engine.N), dtype=complex)
+    state[:] = engine.reset() / np.sqrt(2)
+    engine.apply_controlled_grover(state, power)
+    # Qubit 0 is the control: index c + 2x
+    assert np.allclose(Statevector(qc).data, state.T.reshape(-1))
+
+
+def test_single_precision_buffer():
+    """complex64 stays in complex64 and in agreement with double precision."""
+    weights, target = [3, 5, 7, 2, 8, 1, 4, 6], 12
+    single = VectorGroverEngine.from_problem(weights, target, dtype=np.complex64)
+    double = VectorGroverEngine.from_problem(weights, target)
+
+    assert single.grover_probabilities(5).dtype == np.float32
+    assert np.allclose(single.grover_probabilities(5), double.grover_probabilities(5), atol=1e-6)
+
+
+def test_benchmark_agrees_with_aer():
+    """A small slice of the n=10..24 benchmark: both engines must produce the same state."""
+    rows = benchmark_against_aer(range(10, 12), iterations=2)
+    assert [row["n"] for row in rows] == [10, 11]
+    assert all(row["max_error"] < 1e-9 for row in rows)
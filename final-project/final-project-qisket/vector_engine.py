@@ -0,0 +1,221 @@
+import logging
+import time
+
+import numpy as np
+from Final_Project.analytic import counting_metadata, counts_from_probabilities
+from Final_Project.enumeration import marked_indices
+from Final_Project.planner import plan_simulation
+
+logger = logging.getLogger(__name__)
+
+
+class VectorGroverEngine:
+    """
+    Whole-vector NumPy simulator for Grover search and quantum counting.
+
+    The oracle is a sign flip on a precomputed index array and the diffusion is
+    an inversion about the mean, so one Grover iteration is two O(N) passes over
+    a preallocated buffer with no gate decomposition at all. Amplitudes follow
+    the circuits exactly: D = I - 2|s><s| as built by diffusion_operator maps
+    psi to psi - 2*mean(psi) (the textbook 2*mean - psi up to a global sign).
+
+    Args:
+        n (int): Number of search qubits
+        marked (np.ndarray): Marked basis-state indices (little-endian, see marked_indices)
+        dtype: np.complex128 (default) or np.complex64 to halve the memory
+    """
+
+    def __init__(self, n, marked, dtype=np.complex128):
+        self.n = n
+        self.N = 2 ** n
+        self.marked = np.asarray(marked, dtype=np.int64)
+        self.dtype = np.dtype(dtype)
+        self.state = np.empty(self.N, dtype=self.dtype)
+        self.reset()
+
+    @classmethod
+    def from_problem(cls, weights, target, dtype=np.complex128):
+        """Engine for the subset-sum instance, marked states from the vectorized enumeration."""
+        return cls(len(weights), marked_indices(weights, target), dtype)
+
+    @classmethod
+    def from_circuit(cls, circuit, dtype=np.complex128):
+        """
+        Engine for a circuit built by grover_iteration or quantum_counting_circuit.
+
+        Raises:
+            ValueError: if the circuit metadata does not name its subset-sum instance, or
+                the circuit uses an approximate inverse QFT (only the exact FFT is modelled)
+        """
+        oracle = counting_metadata(circuit).get("oracle", {})
+        if oracle.get("weights") is None or oracle.get("target") is None:
+            raise ValueError("Oracle metadata does not name the subset-sum instance")
+        return cls.from_problem(oracle["weights"], oracle["target"], dtype)
+
+    def reset(self):
+        """Loads the uniform superposition H^n|0> into the buffer."""
+        self.state.fill(1 / np.sqrt(self.N))
+        return self.state
+
+    # --- In-place kernels ---
+
+    def apply_oracle(self, state=None):
+        """O: flips the sign of the marked amplitudes in place."""
+        state = self.state if state is None else state
+        state[..., self.marked] *= -1
+        return state
+
+    def apply_diffusion(self, state=None):
+        """D = I - 2|s><s|: subtracts twice the mean in place."""
+        state = self.state if state is None else state
+        state -= 2 * state.mean(axis=-1, keepdims=True)
+        return state
+
+    def apply_grover(self, iterations=1, state=None):
+        """G^iterations = (D * O)^iterations in place, the operator of grover_iteration."""
+        state = self.state if state is None else state
+        for _ in range(iterations):
+            self.apply_oracle(state)
+            self.apply_diffusion(state)
+        return state
+
+    def apply_controlled_grover(self, state, power=1):
+        """
+        Controlled G^power (controlled_grover) on a (2, N) buffer: row c is the control value.
+
+        Only the control-on row is touched, so the control-off branch costs nothing.
+        """
+        self.apply_grover(power, state[1])
+        return state
+
+    # --- Grover search ---
+
+    def grover_probabilities(self, iterations):
+        """Measurement distribution after 'iterations' Grover iterations from |s>."""
+        self.reset()
+        self.apply_grover(iterations)
+        return np.abs(self.state) ** 2
+
+    # --- Quantum counting ---
+
+    def counting_statevector(self, counting_qubits):
+        """
+        Statevector of logical_counting_circuit(quantum_counting_circuit(...)) (Qiskit ordering).
+
+        Needs a 2^t x N buffer: counting qubit i applies the controlled G^(2^i)
+        to every branch whose index has bit i set, then the inverse QFT is an
+        FFT over the counting axis. Index m + 2^t * x, as in Statevector, with m in
+        logical bit order: the counting circuit itself leaves bit i on counting_layout[i].
+        """
+        T = 2 ** counting_qubits
+        branches = np.empty((T, self.N), dtype=self.dtype)
+        branches[:] = self.reset() / np.sqrt(T)
+
+        for i in range(counting_qubits):
+            on = (np.arange(T) >> i) & 1 == 1
+            block = branches[on]
+            self.apply_grover(2 ** i, block)
+            branches[on] = block
+
+        # Inverse QFT on the counting index: A[m] = 1/sqrt(T) * sum_k e^(-2*pi*i*k*m/T) |k branch>
+        branches = np.fft.fft(branches, axis=0) / np.sqrt(T)
+        return branches.T.reshape(-1).astype(self.dtype, copy=False)
+
+    def counting_probabilities(self, counting_qubits):
+        """
+        Counting-register marginal with one N-sized buffer.
+
+        The branch k holds G^k|s>, and G is unitary, so the Gram matrix of the
+        branches only depends on k - l: <G^l s|G^k s> = c(k - l) with
+        c(d) = <s|G^d|s>. Running G 2^t - 1 times and recording c(d) is enough,
+        which keeps memory at O(N) instead of the O(2^t * N) of the full state.
+        Summing the Gram matrix along its diagonals gives
+            P(m) = 1/T^2 * sum_{|d| < T} (T - |d|) c(d) e^(-2*pi*i*d*m/T)
+        one length-T FFT over the lags: O(T log T) on top of the Grover runs.
+        """
+        T = 2 ** counting_qubits
+        uniform = self.reset().copy()
+        overlaps = np.empty(T, dtype=complex)
+        overlaps[0] = 1.0
+        for d in range(1, T):
+            self.apply_grover(1)
+            overlaps[d] = np.vdot(uniform, self.state)
+
+        # Lag d and lag d - T share e^(-2*pi*i*d*m/T): fold c(-d) = conj(c(d)) onto index T - d
+        weights = T - np.arange(T)
+        lags = weights * overlaps
+        lags[1:] += (weights[1:] * np.conj(overlaps[1:]))[::-1]
+
+        probabilities = np.real(np.fft.fft(lags)) / T ** 2
+        probabilities = np.clip(probabilities, 0.0, None)
+        return probabilities / probabilities.sum()
+
+    def counting_counts(self, counting_qubits, shots=1024, seed=None):
+        """Aer-style counts (t-bit strings, MSB first) of a counting run."""
+        return counts_from_probabilities(self.counting_probabilities(counting_qubits), counting_qubits, shots, seed)
+
+    def run(self, circuit, shots=1024, seed=None):
+        """
+        Counts for a circuit from quantum_counting_circuit, in the format of Aer's get_counts().
+
+        Raises:
+            ValueError: for other circuits, and for an approximate inverse QFT
+        """
+        metadata = counting_metadata(circuit, kinds=("quantum_counting",))
+        return self.counting_counts(metadata["counting_qubits"], shots, seed)
+
+
+def benchmark_against_aer(qubit_range=range(10, 25), iterations=4, target_fraction=0.5, seed=7,
+                          dtype=np.complex128, budget=None):
+    """
+    Times k Grover iterations with the vector engine and with AerSimulator.
+
+    Aer gets its fastest input, the diagonal-mode oracle (native DiagonalGate),
+    so the comparison is against state-vector simulation rather than MCX
+    decomposition. Random weights in 1..n, target at target_fraction of the total.
+    Sizes whose statevector does not fit in 'budget' (see plan_simulation) are
+    skipped with a warning rather than allocated; both engines hold the full vector,
+    so there is no approximate fallback here.
+
+    Returns:
+        list[dict]: One row per n with seconds for both engines and the max amplitude error
+    """
+    from qiskit import QuantumCircuit, transpile
+    from qiskit_aer import AerSimulator
+    from Final_Project.oracle import oracle_from_indices
+    from Final_Project.grover import grover_iteration
+
+    rng = np.random.default_rng(seed)
+    backend = AerSimulator(method="statevector")
+    rows = []
+    for n in qubit_range:
+        precision = "single" if dtype == np.complex64 else "double"
+        plan = plan_simulation(n, precision, budget, allow_mps=False, label="benchmark")
+        if plan["method"] == "refuse":
+            logger.warning("Skipping n=%d: over the memory budget", n)
+            continue
+
+        weights = rng.integers(1, n + 1, size=n).tolist()
+        target = int(sum(weights) * target_fraction)
+        engine = VectorGroverEngine.from_problem(weights, target, dtype)
+
+        start = time.perf_counter()
+        engine.reset()
+        engine.apply_grover(iterations)
+        vector_seconds = time.perf_counter() - start
+
+        qc = QuantumCircuit(n)
+        qc.h(range(n))
+        grover = grover_iteration(oracle_from_indices(engine.marked, n, mode="diagonal"), n)
+        for _ in range(iterations):
+            qc.compose(grover, inplace=True)
+        qc.save_statevector()
+        compiled = transpile(qc, backend, optimization_level=1)
+
+        start = time.perf_counter()
+        aer_state = np.asarray(backend.run(compiled).result().get_statevector())
+        aer_seconds = time.perf_counter() - start
+
+        rows.append({"n": n, "marked": len(engine.marked), "vector_seconds": vector_seconds,
+                     "aer_seconds": aer_seconds, "max_error": float(np.max(np.abs(aer_state - engine.state)))})
+    return rows